@@ -4,13 +4,17 @@ from .adapters import (
     TapiocaAdapterFormMixin,
     TapiocaAdapterJSON,
     TapiocaAdapterJSONMixin,
+    TapiocaAdapterNDJSON,
+    TapiocaAdapterNDJSONMixin,
     TapiocaAdapterPydantic,
     TapiocaAdapterPydanticMixin,
     TapiocaAdapterXML,
     TapiocaAdapterXMLMixin,
 )
 from .client import (
+    BatchResult,
     ProcessData,
+    RequestLimiter,
     TapiocaClient,
     TapiocaClientExecutor,
     TapiocaClientResource,
@@ -22,7 +26,16 @@ from .exceptions import (
     ServerError,
     TapiocaException,
 )
+from .executors import InlineExecutor
 from .generate import TapiocaInstantiator, generate_wrapper_from_adapter
+from .retry import (
+    BaseRetryPolicy,
+    DecorrelatedJitterRetryPolicy,
+    ExponentialRetryPolicy,
+    FixedRetryPolicy,
+    RequestAttempt,
+    RetryAfterRetryPolicy,
+)
 from .serializers import BaseSerializer, SimpleSerializer
 
 
@@ -32,11 +45,15 @@ __all__ = (
     "TapiocaAdapterFormMixin",
     "TapiocaAdapterJSON",
     "TapiocaAdapterJSONMixin",
+    "TapiocaAdapterNDJSON",
+    "TapiocaAdapterNDJSONMixin",
     "TapiocaAdapterPydantic",
     "TapiocaAdapterPydanticMixin",
     "TapiocaAdapterXML",
     "TapiocaAdapterXMLMixin",
+    "BatchResult",
     "ProcessData",
+    "RequestLimiter",
     "TapiocaClient",
     "TapiocaClientExecutor",
     "TapiocaClientResource",
@@ -45,8 +62,15 @@ __all__ = (
     "ResponseProcessException",
     "ServerError",
     "TapiocaException",
+    "InlineExecutor",
     "TapiocaInstantiator",
     "generate_wrapper_from_adapter",
+    "BaseRetryPolicy",
+    "DecorrelatedJitterRetryPolicy",
+    "ExponentialRetryPolicy",
+    "FixedRetryPolicy",
+    "RequestAttempt",
+    "RetryAfterRetryPolicy",
     "BaseSerializer",
     "SimpleSerializer",
 )
@@ -2,12 +2,14 @@ from .adapters import (
     TapiocaAdapter,
     TapiocaAdapterForm,
     TapiocaAdapterJSON,
+    TapiocaAdapterNDJSON,
     TapiocaAdapterPydantic,
     TapiocaAdapterXML,
 )
 from .mixins import (
     TapiocaAdapterFormMixin,
     TapiocaAdapterJSONMixin,
+    TapiocaAdapterNDJSONMixin,
     TapiocaAdapterPydanticMixin,
     TapiocaAdapterXMLMixin,
 )
@@ -19,6 +21,8 @@ __all__ = (
     "TapiocaAdapterFormMixin",
     "TapiocaAdapterJSON",
     "TapiocaAdapterJSONMixin",
+    "TapiocaAdapterNDJSON",
+    "TapiocaAdapterNDJSONMixin",
     "TapiocaAdapterPydantic",
     "TapiocaAdapterPydanticMixin",
     "TapiocaAdapterXML",
@@ -1,35 +1,40 @@
-from sys import version_info
-from typing import Any, Dict, Type
+from asyncio import get_running_loop
+from concurrent.futures import Executor
+from contextvars import copy_context
+from functools import partial
+from typing import Any, Dict, Optional, Type
 
 from aiotapioca.exceptions import ClientError, ServerError
+from aiotapioca.executors import (
+    InlineExecutor,
+    decode_for_transfer,
+    load_transferred,
+)
+from aiotapioca.retry import BaseRetryPolicy
 from aiotapioca.serializers import BaseSerializer, SimpleSerializer
-
-from ..utils import coro_wrap
+from aiotapioca.streams import ResponseStream, is_stream_body, open_stream_body
+
+from ..utils import (
+    compile_url_template,
+    coro_wrap,
+    estimate_size,
+    normalize_keys,
+    to_snake_case,
+)
 from .mixins import (
     TapiocaAdapterFormMixin,
     TapiocaAdapterJSONMixin,
+    TapiocaAdapterNDJSONMixin,
     TapiocaAdapterPydanticMixin,
     TapiocaAdapterXMLMixin,
 )
 
 
-if version_info >= (3, 9):
-    from asyncio import to_thread  # type: ignore
-else:
-    from asyncio import get_running_loop
-    from concurrent.futures import ThreadPoolExecutor
-    from functools import partial
-
-    async def to_thread(func, *args, **kwargs):
-        loop = get_running_loop()
-        with ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
-
-
 __all__ = (
     "TapiocaAdapter",
     "TapiocaAdapterForm",
     "TapiocaAdapterJSON",
+    "TapiocaAdapterNDJSON",
     "TapiocaAdapterPydantic",
     "TapiocaAdapterXML",
 )
@@ -38,10 +43,18 @@ __all__ = (
 class TapiocaAdapter:
     serializer_class: Type[BaseSerializer] = SimpleSerializer
     max_retries_requests: int = 10
+    retry_policy: BaseRetryPolicy = BaseRetryPolicy()
     semaphore: int = 10
+    semaphore_per_host: Optional[int] = None
     refresh_token: bool = False
     resource_mapping: Dict[str, Any] = {}
     api_root: str = ""
+    quote_url_params: bool = True
+    normalize_response_keys: bool = False
+    executor: Optional[Executor] = None
+    inline_size_threshold: int = 1024
+    process_executor: Optional[Executor] = None
+    process_size_threshold: int = 8 * 1024 * 1024
 
     def __init__(self, serializer_class=None, *args, **kwargs):
         if serializer_class:
@@ -80,7 +93,8 @@ class TapiocaAdapter:
 
     def fill_resource_template_url(self, template, url_params, **kwargs):
         if isinstance(template, str):
-            return template.format(**url_params)
+            url_template = compile_url_template(template)
+            return url_template.fill(url_params, self.quote_url_params)
         else:
             return template
 
@@ -99,7 +113,22 @@ class TapiocaAdapter:
     async def data_to_request(self, data, *args, **kwargs):
         if not data:
             return None
-        return await to_thread(self.prepare_request_data, data, *args, **kwargs)
+        if is_stream_body(data):
+            # sent as it is read, without serializing it into memory first
+            return open_stream_body(data)
+        size = estimate_size(data, self.inline_size_threshold)
+        return await self.run_in_executor(
+            size, self.prepare_request_data, data, *args, **kwargs
+        )
+
+    async def run_in_executor(self, size, func, *args, **kwargs):
+        # offloading small payloads costs more than processing them on the loop
+        executor = self.executor
+        if isinstance(executor, InlineExecutor) or size < self.inline_size_threshold:
+            return func(*args, **kwargs)
+        loop = get_running_loop()
+        func = partial(copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(executor, func)
 
     def prepare_request_data(self, data, *args, **kwargs):
         serialized = self.serialize_data(data, *args, **kwargs)
@@ -108,7 +137,12 @@ class TapiocaAdapter:
     def format_data_to_request(self, data, *args, **kwargs):
         raise NotImplementedError()
 
-    async def process_response(self, response, **kwargs):
+    async def process_response(self, response, stream=False, **kwargs):
+        if 200 <= response.status < 300:
+            if stream:
+                return ResponseStream(response)
+            if self.is_response_streamed(response, **kwargs):
+                return self.stream_response_data(response, **kwargs)
         non_native_data = await self.get_response_data(response, **kwargs)
         data = await self.response_to_native(non_native_data, response, **kwargs)
         if 400 <= response.status < 600:
@@ -122,13 +156,55 @@ class TapiocaAdapter:
     async def response_to_native(self, non_native_data, response, **kwargs):
         if not non_native_data:
             return None
-        return await to_thread(
-            self.format_response_data_to_native, non_native_data, response, **kwargs
+        size = estimate_size(non_native_data, self.inline_size_threshold)
+        if (
+            self.process_executor is not None
+            and isinstance(non_native_data, (str, bytes, bytearray))
+            and len(non_native_data) >= self.process_size_threshold
+        ):
+            decoder = self.get_process_decoder(response, **kwargs)
+            if decoder is not None:
+                # decoding holds the GIL, so very large bodies are decoded in
+                # another process and only the result is sent back
+                loop = get_running_loop()
+                transferred = await loop.run_in_executor(
+                    self.process_executor,
+                    partial(decode_for_transfer, decoder),
+                    non_native_data,
+                )
+                non_native_data = await self.run_in_executor(
+                    size, load_transferred, transferred
+                )
+                kwargs["response_decoded"] = True
+        return await self.run_in_executor(
+            size,
+            self.prepare_response_data,
+            non_native_data,
+            response,
+            **kwargs,
         )
 
+    def prepare_response_data(self, non_native_data, response, **kwargs):
+        data = self.format_response_data_to_native(non_native_data, response, **kwargs)
+        if self.normalize_response_keys:
+            data = normalize_keys(data, self.normalize_response_key)
+        return data
+
+    def normalize_response_key(self, key):
+        return to_snake_case(key)
+
+    def get_process_decoder(self, response, **kwargs):
+        return None
+
     def format_response_data_to_native(self, non_native_data, response, **kwargs):
         raise NotImplementedError()
 
+    def is_response_streamed(self, response, resource=None, **kwargs):
+        return bool(resource and resource.get("stream_array"))
+
+    def stream_response_data(self, response, **kwargs):
+        raise NotImplementedError()
+
     def get_error_message(self, data, response, **kwargs):
         return str(data)
 
@@ -146,6 +222,11 @@ class TapiocaAdapter:
     ):
         raise NotImplementedError()
 
+    def get_iterator_pages_request_kwargs(
+        self, request_kwargs, data, response, **kwargs
+    ):
+        return None
+
     def is_authentication_expired(self, exception, repeat_number=0, **kwargs):
         return False
 
@@ -167,6 +248,10 @@ class TapiocaAdapterJSON(TapiocaAdapterJSONMixin, TapiocaAdapter):
     pass
 
 
+class TapiocaAdapterNDJSON(TapiocaAdapterNDJSONMixin, TapiocaAdapter):
+    pass
+
+
 class TapiocaAdapterPydantic(TapiocaAdapterPydanticMixin, TapiocaAdapter):
     pass
 
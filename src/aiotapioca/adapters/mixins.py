@@ -1,6 +1,19 @@
 from collections.abc import Mapping
+from functools import lru_cache, partial
+from os import PathLike, fspath
+from os.path import basename
 from typing import TYPE_CHECKING
 
+from aiohttp import FormData
+
+from aiotapioca.streams import (
+    JSONArrayStream,
+    NDJSONStream,
+    is_stream_body,
+    open_stream_body,
+)
+from aiotapioca.utils import normalize_keys
+
 
 if TYPE_CHECKING:
     import dataclasses
@@ -19,6 +32,7 @@ else:
 __all__ = (
     "TapiocaAdapterFormMixin",
     "TapiocaAdapterJSONMixin",
+    "TapiocaAdapterNDJSONMixin",
     "TapiocaAdapterPydanticMixin",
     "TapiocaAdapterXMLMixin",
 )
@@ -36,6 +50,21 @@ def import_pydantic() -> None:
         ) from exc
 
 
+@lru_cache(maxsize=256)
+def _get_cached_type_adapter(model):
+    return pydantic.TypeAdapter(model)
+
+
+def get_type_adapter(model):
+    # building a TypeAdapter builds the validator of the model, the adapters of
+    # the most recently used models are shared by every client
+    try:
+        hash(model)
+    except TypeError:
+        return pydantic.TypeAdapter(model)
+    return _get_cached_type_adapter(model)
+
+
 def import_xmltodict() -> None:
     global xmltodict
     try:
@@ -46,33 +75,89 @@ def import_xmltodict() -> None:
         ) from exc
 
 
+def loads_json(data):
+    try:
+        return json.loads(data)
+    except ValueError:
+        # JSONDecodeError, or UnicodeDecodeError for bodies that aren't UTF-8
+        return data
+
+
 class TapiocaAdapterFormMixin:
+    def get_request_kwargs(self, *args, **kwargs):
+        # aiohttp sets the urlencoded or multipart content type from the data
+        return kwargs.get("request_kwargs", {})
+
     def format_data_to_request(self, data, *args, **kwargs):
+        if isinstance(data, Mapping) and any(map(is_stream_body, data.values())):
+            return self._get_multipart_form_data(data)
         return data
 
+    def _get_multipart_form_data(self, data):
+        form_data = FormData()
+        for name, value in data.items():
+            if isinstance(value, PathLike):
+                filename = basename(fspath(value))
+                form_data.add_field(name, open_stream_body(value), filename=filename)
+            elif hasattr(value, "__aiter__"):
+                form_data.add_field(name, value, filename=name)
+            else:
+                form_data.add_field(name, value)
+        return form_data
+
     def format_response_data_to_native(self, non_native_data, response, **kwargs):
         return {"text": non_native_data}
 
 
 class TapiocaAdapterJSONMixin:
+    serialize_in_json_encoder = False
+
     def get_request_kwargs(self, *args, **kwargs):
         request_kwargs = kwargs.get("request_kwargs", {})
         if "headers" not in request_kwargs:
             request_kwargs["headers"] = {}
-        request_kwargs["headers"]["Content-Type"] = "application/json"
+        if not is_stream_body(request_kwargs.get("data")):
+            # streamed bodies are sent as they are, with the caller's content type
+            request_kwargs["headers"]["Content-Type"] = "application/json"
         return request_kwargs
 
+    def serialize_data(self, data, *args, **kwargs):
+        if self.serialize_in_json_encoder:
+            # the serializer is called by the encoder, see _dumps_to_json
+            return data
+        return super().serialize_data(data, *args, **kwargs)
+
     def format_data_to_request(self, data, *args, **kwargs):
         if data:
-            return json.dumps(data)
+            return self._dumps_to_json(data)
+
+    async def get_response_data(self, response, **kwargs):
+        # the JSON libraries decode bytes directly, which saves decoding the
+        # body to text first
+        return await response.read()
 
     def format_response_data_to_native(self, non_native_data, response, **kwargs):
         if not non_native_data:
             return None
-        try:
-            return json.loads(non_native_data)
-        except json.JSONDecodeError:
-            return non_native_data
+        if kwargs.get("response_decoded"):
+            data = non_native_data
+        else:
+            data = loads_json(non_native_data)
+        if isinstance(data, (bytes, bytearray)):
+            # not JSON, falls back to the text of the response
+            return data.decode(response.get_encoding())
+        return data
+
+    def get_process_decoder(self, response, **kwargs):
+        return loads_json
+
+    def stream_response_data(self, response, **kwargs):
+        return JSONArrayStream(response, self._get_stream_item_converter())
+
+    def _get_stream_item_converter(self):
+        if self.normalize_response_keys:
+            return partial(normalize_keys, normalize_key=self.normalize_response_key)
+        return None
 
     def get_error_message(self, data, response, **kwargs):
         if isinstance(data, dict):
@@ -83,6 +168,37 @@ class TapiocaAdapterJSONMixin:
             return str(data)
         return data
 
+    def _dumps_to_json(self, data):
+        if self.serialize_in_json_encoder and self.serializer:
+            return json.dumps(data, default=self.serializer.json_default)
+        return json.dumps(data)
+
+
+class TapiocaAdapterNDJSONMixin(TapiocaAdapterJSONMixin):
+    """
+    Successful responses are newline-delimited JSON (JSON Lines), decoded
+    line by line as the body is received.
+    """
+
+    def get_request_kwargs(self, *args, **kwargs):
+        request_kwargs = super().get_request_kwargs(*args, **kwargs)
+        request_kwargs["headers"].setdefault("Accept", "application/x-ndjson")
+        return request_kwargs
+
+    def is_response_streamed(self, response, resource=None, **kwargs):
+        return True
+
+    def stream_response_data(self, response, **kwargs):
+        return NDJSONStream(response, self._get_stream_item_converter())
+
+    def get_iterator_list(self, data, **kwargs):
+        return data
+
+    def get_iterator_next_request_kwargs(
+        self, request_kwargs, data, response, **kwargs
+    ):
+        return None
+
 
 class TapiocaAdapterPydanticMixin(TapiocaAdapterJSONMixin):
     forced_to_have_model = False
@@ -92,6 +208,20 @@ class TapiocaAdapterPydanticMixin(TapiocaAdapterJSONMixin):
     convert_to_dict = False
     to_dict_by_alias = True
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if pydantic is None:
+            import_pydantic()
+        # the models are resolved once, so mistakes in the configuration fail
+        # when the client is created instead of on requests
+        self._pydantic_models_indexes = {
+            resource_name: (
+                resource.get("pydantic_models"),
+                self.compile_pydantic_models(resource.get("pydantic_models")),
+            )
+            for resource_name, resource in self.resource_mapping.items()
+        }
+
     def format_data_to_request(self, data, *args, **kwargs):
         if pydantic is None:
             import_pydantic()
@@ -99,7 +229,7 @@ class TapiocaAdapterPydanticMixin(TapiocaAdapterJSONMixin):
             if self.validate_data_sending:
                 data = self.convert_data_to_pydantic_model("request", data, **kwargs)
             data = self.convert_pydantic_model_to_dict(data, *args, **kwargs)
-            return json.dumps(data)
+            return self._dumps_to_json(data)
 
     def format_response_data_to_native(self, non_native_data, response, **kwargs):
         if pydantic is None:
@@ -138,60 +268,101 @@ class TapiocaAdapterPydanticMixin(TapiocaAdapterJSONMixin):
             return data
         model = self.get_pydantic_model(type_convert, **kwargs)
         if model:
-            return pydantic.TypeAdapter(model).validate_python(data)
+            return get_type_adapter(model).validate_python(data)
         return data
 
-    def get_pydantic_model(self, type_convert, resource, request_method, **kwargs):
-        model = None
+    def get_pydantic_model(
+        self, type_convert, resource, request_method, resource_name=None, **kwargs
+    ):
+        models_index = self._get_pydantic_models_index(resource, resource_name)
+        model = models_index.get((type_convert, request_method.upper()))
+        if model is None:
+            model = models_index.get((type_convert, None))
+        if model is None and self.forced_to_have_model:
+            raise ValueError(
+                "Pydantic model not found."
+                " Specify the model in the pydantic_models parameter"
+                " in resource_mapping"
+            )
+        return model
+
+    def _get_pydantic_models_index(self, resource, resource_name=None):
         models = resource.get("pydantic_models")
-        if isinstance(models, type(pydantic.BaseModel)) or dataclasses.is_dataclass(
-            models
-        ):
-            model = models
-        elif isinstance(models, dict):
-            method = request_method.upper()
-            if "request" in models or "response" in models:
-                models = models.get(type_convert)
-            if isinstance(models, type(pydantic.BaseModel)) or dataclasses.is_dataclass(
-                models
+        cached = self._pydantic_models_indexes.get(resource_name)
+        if cached is not None and (cached[0] is models or cached[0] == models):
+            return cached[1]
+        # resources of a dynamic resource mapping are indexed on first use, and
+        # again only when their models change
+        models_index = self.compile_pydantic_models(models)
+        if resource_name is not None:
+            self._pydantic_models_indexes[resource_name] = (models, models_index)
+        return models_index
+
+    def compile_pydantic_models(self, models):
+        """
+        Compiles the pydantic_models of a resource into a
+        {(type_convert, method): model} index, the models used by
+        default are stored with the None method.
+        """
+        models_index = {}
+        if models is None:
+            return models_index
+        if not isinstance(models, dict):
+            models = {models: None}
+        if "request" in models or "response" in models:
+            for type_convert in ("request", "response"):
+                type_models = models.get(type_convert)
+                if type_models is None:
+                    continue
+                if not isinstance(type_models, dict):
+                    type_models = {type_models: None}
+                self._add_pydantic_models(models_index, (type_convert,), type_models)
+        else:
+            self._add_pydantic_models(models_index, ("request", "response"), models)
+        return models_index
+
+    def _add_pydantic_models(self, models_index, types_convert, models):
+        for model, methods in models.items():
+            self._check_pydantic_model(model)
+            if methods is None:
+                methods = (None,)
+            elif isinstance(methods, str):
+                methods = (methods.upper(),)
+            elif isinstance(methods, (list, tuple)) and all(
+                isinstance(method, str) for method in methods
             ):
-                model = models
-            elif isinstance(models, dict):
-                for key, value in models.items():
-                    if isinstance(
-                        key, type(pydantic.BaseModel)
-                    ) or dataclasses.is_dataclass(key):
-                        if isinstance(value, str) and value.upper() == method:
-                            model = key
-                            break
-                        elif isinstance(value, (list, tuple)):
-                            for item in value:
-                                if item.upper() == request_method:
-                                    model = key
-                                    break
-        # search default model
-        if not model and isinstance(models, dict):
-            if "request" in models or "response" in models:
-                models = models.get(type_convert)
-            if isinstance(models, dict):
-                for key, value in models.items():
-                    if value is None:
-                        model = key
-                        break
-        if self.forced_to_have_model:
-            if not model:
-                raise ValueError(
-                    "Pydantic model not found."
-                    " Specify the model in the pydantic_models parameter"
-                    " in resource_mapping"
+                methods = [method.upper() for method in methods]
+            else:
+                raise TypeError(
+                    f"Methods of the pydantic model {model} must be a string,"
+                    f" a list of strings or None: {methods!r}."
                 )
-            if (
-                not isinstance(model, type(pydantic.BaseModel))
-                or dataclasses.is_dataclass(model)
-                and not hasattr(model, "__pydantic_model__")
-            ):
-                raise TypeError(f"It isn't pydantic model or dataclass: {model}.")
-        return model
+            for method in methods:
+                for type_convert in types_convert:
+                    key = (type_convert, method)
+                    if key in models_index:
+                        raise ValueError(
+                            f"Several pydantic models for the {method or 'default'}"
+                            f" {type_convert}: {models_index[key]} and {model}."
+                        )
+                    models_index[key] = model
+
+    def _check_pydantic_model(self, model):
+        if self.forced_to_have_model:
+            is_model = isinstance(model, type) and (
+                issubclass(model, pydantic.BaseModel)
+                or pydantic.dataclasses.is_pydantic_dataclass(model)
+            )
+        else:
+            is_model = model is not None and not isinstance(model, str)
+        if is_model:
+            try:
+                # also builds the validator used on requests
+                get_type_adapter(model)
+            except pydantic.PydanticSchemaGenerationError:
+                is_model = False
+        if not is_model:
+            raise TypeError(f"It isn't pydantic model or dataclass: {model}.")
 
 
 class TapiocaAdapterXMLMixin:
@@ -205,10 +376,19 @@ class TapiocaAdapterXMLMixin:
         if xmltodict is None:
             import_xmltodict()
         if non_native_data:
+            if kwargs.get("response_decoded"):
+                return non_native_data
             if "xml" in response.headers["content-type"]:
                 return xmltodict.parse(non_native_data, **self._xmltodict_parse_kwargs)
             return non_native_data
 
+    def get_process_decoder(self, response, **kwargs):
+        if xmltodict is None:
+            import_xmltodict()
+        if "xml" in response.headers["content-type"]:
+            return partial(xmltodict.parse, **self._xmltodict_parse_kwargs)
+        return None
+
     def get_request_kwargs(self, *args, **kwargs):
         request_kwargs = kwargs.get("request_kwargs", {})
 
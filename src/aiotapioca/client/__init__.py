@@ -1,14 +1,18 @@
+from .batch import BatchResult
 from .client import (
     TapiocaClient,
     TapiocaClientExecutor,
     TapiocaClientResource,
     TapiocaClientResponse,
 )
+from .limiter import RequestLimiter
 from .process_data import ProcessData
 
 
 __all__ = (
+    "BatchResult",
     "ProcessData",
+    "RequestLimiter",
     "TapiocaClient",
     "TapiocaClientExecutor",
     "TapiocaClientResource",
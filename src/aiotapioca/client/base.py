@@ -110,11 +110,20 @@ class BaseTapiocaClientResource(BaseTapiocaClient):
 
 
 class BaseTapiocaClientExecutor(BaseTapiocaClientResource):
-    def __init__(self, response=None, data=None, request_kwargs=None, *args, **kwargs):
+    def __init__(
+        self,
+        response=None,
+        data=None,
+        request_kwargs=None,
+        attempts=None,
+        *args,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self._response = response
         self._data = data
         self._request_kwargs = request_kwargs or {}
+        self._attempts = attempts or []
 
     def _wrap_in_tapioca_response(self, **kwargs):
         context = self._get_context(**kwargs)
@@ -142,6 +151,10 @@ class BaseTapiocaClientResponse(BaseTapiocaClientExecutor):
     def request_kwargs(self):
         return self._request_kwargs
 
+    @property
+    def attempts(self):
+        return self._attempts
+
     @property
     def data(self):
         return ProcessData(self._api, self._data, self._resource)
@@ -0,0 +1,162 @@
+from asyncio import FIRST_COMPLETED, CancelledError, ensure_future, gather, wait
+
+from ..utils import iterate
+
+
+__all__ = (
+    "BatchResult",
+    "gather_batch",
+    "iter_batch",
+    "pop_batch_options",
+    "run_batch",
+)
+
+
+class BatchResult:
+    def __init__(self):
+        self.responses = {}
+        self.errors = {}
+        self.failed = {}
+
+    def __str__(self):
+        return (
+            f"<{type(self).__name__} object:"
+            f" {len(self.responses)} succeeded, {len(self.errors)} failed>"
+        )
+
+    def __len__(self):
+        return len(self.responses) + len(self.errors)
+
+    def __iter__(self):
+        results = {**self.responses, **self.errors}
+        for index in sorted(results):
+            yield results[index]
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    @property
+    def cancelled(self):
+        return [
+            index
+            for index, error in sorted(self.errors.items())
+            if isinstance(error, CancelledError)
+        ]
+
+    @property
+    def failed_data(self):
+        """
+        Rows of the failed and cancelled requests, in input order,
+        ready to be resubmitted. After a fail_fast stop the rows that
+        were never sent are reported as cancelled too.
+        """
+        return [self.failed[index] for index in sorted(self.failed)]
+
+    def add(self, index, row, response=None, error=None):
+        if error is None:
+            self.responses[index] = response
+        else:
+            self.errors[index] = error
+            self.failed[index] = row
+
+
+def pop_batch_options(kwargs, default_window=None):
+    window = kwargs.pop("window", None)
+    semaphore = kwargs.pop("semaphore", None)
+    ordered = kwargs.pop("ordered", False)
+    reorder_buffer = kwargs.pop("reorder_buffer", None)
+    return {
+        "window": window or semaphore or default_window,
+        "ordered": ordered,
+        "reorder_buffer": reorder_buffer if ordered else None,
+        "fail_fast": kwargs.pop("fail_fast", False),
+    }
+
+
+async def run_batch(
+    send,
+    rows,
+    window=None,
+    ordered=False,
+    reorder_buffer=None,
+    fail_fast=False,
+    report_unsent=False,
+):
+    # rows are pulled lazily and at most `window` requests are in flight,
+    # so the memory used does not depend on the size of the input
+    rows = iterate(rows)
+    tasks = {}
+    buffered = {}
+    count = next_index = 0
+    exhausted = failed = False
+    try:
+        while True:
+            while (
+                not exhausted
+                and not failed
+                and (not window or len(tasks) < window)
+                and (not reorder_buffer or count - next_index < reorder_buffer)
+            ):
+                try:
+                    row = await rows.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                tasks[ensure_future(send(row))] = (count, row)
+                count += 1
+            if not tasks:
+                if failed and report_unsent:
+                    # the rows left after a fail_fast stop are reported as
+                    # cancelled, so that they can be resubmitted
+                    async for row in rows:
+                        yield count, row, None, CancelledError()
+                        count += 1
+                return
+            done, _ = await wait(tasks, return_when=FIRST_COMPLETED)
+            for task in sorted(done, key=lambda task: tasks[task][0]):
+                index, row = tasks.pop(task)
+                error = CancelledError() if task.cancelled() else task.exception()
+                result = (index, row, None if error else task.result(), error)
+                if not ordered:
+                    yield result
+                else:
+                    buffered[index] = result
+                    while next_index in buffered:
+                        yield buffered.pop(next_index)
+                        next_index += 1
+                if error is not None and fail_fast and not failed:
+                    failed = True
+                    for pending_task in tasks:
+                        pending_task.cancel()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
+
+
+async def iter_batch(batch, return_exceptions=False):
+    try:
+        async for index, row, response, error in batch:
+            if error is None:
+                yield index, response
+            elif return_exceptions:
+                yield index, error
+            else:
+                raise error
+    finally:
+        # cancels the requests still in flight if the batch was interrupted
+        await batch.aclose()
+
+
+async def gather_batch(batch, return_exceptions=False):
+    if return_exceptions:
+        result = BatchResult()
+        async for index, row, response, error in batch:
+            result.add(index, row, response, error)
+        return result
+
+    results = {}
+    async for index, response in iter_batch(batch):
+        results[index] = response
+    return [results[index] for index in range(len(results))]
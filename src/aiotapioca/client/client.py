@@ -1,16 +1,21 @@
 import webbrowser
-from asyncio import Semaphore, gather, get_event_loop
+from asyncio import Queue, Semaphore, ensure_future, gather, get_event_loop, sleep
 from contextlib import suppress
+from itertools import islice
+from time import monotonic
 
 from aiotapioca.exceptions import ResponseProcessException
+from aiotapioca.retry import RequestAttempt
 
-from ..utils import coro_wrap
+from ..utils import coro_wrap, iterate
 from .base import (
     BaseTapiocaClient,
     BaseTapiocaClientExecutor,
     BaseTapiocaClientResource,
     BaseTapiocaClientResponse,
 )
+from .batch import gather_batch, iter_batch, pop_batch_options, run_batch
+from .limiter import RequestLimiter
 
 
 __all__ = (
@@ -22,8 +27,14 @@ __all__ = (
 
 
 class TapiocaClient(BaseTapiocaClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._limiter = None
+        self._resources = {}
+        self._resources_api_params = None
+
     def __dir__(self):
-        methods = ["api_params", "close", "closed", "initialize", "session"]
+        methods = ["api_params", "close", "closed", "initialize", "limiter", "session"]
         resource_mapping = self._api.get_resource_mapping(self._api_params)
         if resource_mapping:
             methods.extend(list(resource_mapping))
@@ -59,12 +70,36 @@ class TapiocaClient(BaseTapiocaClient):
                 else:
                     loop.run_until_complete(coro)
 
+    @property
+    def limiter(self):
+        if self._limiter is None:
+            self._limiter = RequestLimiter(
+                self._api_params.get("semaphore") or self._api.semaphore,
+                self._api_params.get("semaphore_per_host")
+                or self._api.semaphore_per_host,
+            )
+        return self._limiter
+
     def _get_context(self, **kwargs):
         context = super()._get_context(**kwargs)
+        for key in ("limiter", "resources", "resources_api_params"):
+            context.pop(key, None)
         context["client"] = self
         return context
 
     def _get_client_resource_from_name_or_fallback(self, name):
+        # resolved resources are reused while api_params and session don't change
+        if self._resources_api_params != self._api_params:
+            self._resources = {}
+            self._resources_api_params = {**self._api_params}
+        resource = self._resources.get(name)
+        if resource is None or resource._session is not self._session:
+            resource = self._resolve_client_resource(name)
+            if resource is not None:
+                self._resources[name] = resource
+        return resource
+
+    def _resolve_client_resource(self, name):
         # if could not access, faдlback to resource mapping
         resource_mapping = self._api.get_resource_mapping(self._api_params)
         if name in resource_mapping:
@@ -92,6 +127,8 @@ class TapiocaClientResource(BaseTapiocaClientResource):
             "resource",
             "resource_name",
             "session",
+            "get_batch",
+            "get_batch_iter",
             "open_docs",
         ]
         if self._resource_name is not None:
@@ -102,8 +139,7 @@ class TapiocaClientResource(BaseTapiocaClientResource):
     def __call__(self, **kwargs):
         path = self._path
 
-        url_params = self._api_params.get("default_url_params", {})
-        url_params.update(kwargs)
+        url_params = {**self._api_params.get("default_url_params", {}), **kwargs}
         if self._resource and url_params:
             path = self._api.fill_resource_template_url(
                 **self._get_context(url_params=url_params, template=self._path)
@@ -111,6 +147,26 @@ class TapiocaClientResource(BaseTapiocaClientResource):
 
         return self._wrap_in_tapioca_executor(path=path)
 
+    async def get_batch(self, url_params, *args, **kwargs):
+        return_exceptions = kwargs.pop("return_exceptions", False)
+        batch = self._run_get_batch(
+            url_params, *args, report_unsent=return_exceptions, **kwargs
+        )
+        return await gather_batch(batch, return_exceptions)
+
+    def get_batch_iter(self, url_params, *args, **kwargs):
+        return_exceptions = kwargs.pop("return_exceptions", False)
+        batch = self._run_get_batch(url_params, *args, **kwargs)
+        return iter_batch(batch, return_exceptions)
+
+    def _run_get_batch(self, url_params, *args, report_unsent=False, **kwargs):
+        options = pop_batch_options(kwargs, self._client.limiter.limit)
+
+        def send(row):
+            return self(**row).get(*args, **kwargs)
+
+        return run_batch(send, url_params, report_unsent=report_unsent, **options)
+
     def _get_doc(self):
         from copy import copy
 
@@ -172,54 +228,75 @@ class TapiocaClientExecutor(BaseTapiocaClientExecutor):
     async def delete_batch(self, *args, **kwargs):
         return await self._send_batch("DELETE", *args, **kwargs)
 
-    async def pages(self, max_pages=None, max_items=None):
-        executor = self
-        iterator_list = executor._get_iterator_list()
-        page_count = 0
-        item_count = 0
+    def post_batch_iter(self, *args, **kwargs):
+        return self._iter_batch("POST", *args, **kwargs)
 
-        while iterator_list:
-            for item in iterator_list:
-                if executor._reached_max_limits(
-                    page_count, item_count, max_pages, max_items
-                ):
-                    break
-                yield executor._wrap_in_tapioca_response(data=item)
-                item_count += 1
-
-            page_count += 1
+    def put_batch_iter(self, *args, **kwargs):
+        return self._iter_batch("PUT", *args, **kwargs)
 
-            if executor._reached_max_limits(
-                page_count, item_count, max_pages, max_items
-            ):
-                break
+    def patch_batch_iter(self, *args, **kwargs):
+        return self._iter_batch("PATCH", *args, **kwargs)
 
-            next_request_kwargs = await executor._get_iterator_next_request_kwargs()
+    def delete_batch_iter(self, *args, **kwargs):
+        return self._iter_batch("DELETE", *args, **kwargs)
 
-            if not next_request_kwargs:
-                break
+    def pages(
+        self,
+        max_pages=None,
+        max_items=None,
+        prefetch=0,
+        raw=False,
+        checkpoint=None,
+        on_checkpoint=None,
+    ):
+        pages = self._iter_pages(max_pages, prefetch, checkpoint)
+        return self._iter_page_items(
+            pages, max_pages, max_items, raw, checkpoint, on_checkpoint
+        )
 
-            response = await executor.get(**next_request_kwargs)
-            executor = response()
-            iterator_list = executor._get_iterator_list()
+    def pages_parallel(
+        self, max_pages=None, max_items=None, ordered=True, window=None, raw=False
+    ):
+        pages = self._iter_parallel_pages(max_pages, ordered, window)
+        return self._iter_page_items(pages, max_pages, max_items, raw)
+
+    def iter_pages(
+        self,
+        max_pages=None,
+        max_items=None,
+        prefetch=0,
+        checkpoint=None,
+        on_checkpoint=None,
+    ):
+        pages = self._iter_pages(max_pages, prefetch, checkpoint)
+        return self._iter_page_lists(
+            pages, max_pages, max_items, checkpoint, on_checkpoint
+        )
 
     async def _send_batch(self, request_method, *args, **kwargs):
-        data = kwargs.pop("data", [])
+        return_exceptions = kwargs.pop("return_exceptions", False)
+        batch = self._run_batch(
+            request_method, *args, report_unsent=return_exceptions, **kwargs
+        )
+        return await gather_batch(batch, return_exceptions)
 
-        kwargs["semaphore_class"] = Semaphore(self._get_semaphore_value(kwargs))
+    def _iter_batch(self, request_method, *args, **kwargs):
+        return_exceptions = kwargs.pop("return_exceptions", False)
+        batch = self._run_batch(request_method, *args, **kwargs)
+        return iter_batch(batch, return_exceptions)
 
-        return await gather(
-            *[
-                self._send(request_method, *args, **{**kwargs, "data": row})
-                for row in data
-            ]
-        )
+    def _run_batch(self, request_method, *args, report_unsent=False, **kwargs):
+        rows = kwargs.pop("data", [])
+        options = pop_batch_options(kwargs, self._client.limiter.limit)
 
-    async def _send(self, request_method, *args, **kwargs):
-        if "semaphore_class" not in kwargs:
-            kwargs["semaphore_class"] = Semaphore(self._get_semaphore_value(kwargs))
+        def send(row):
+            return self._send(request_method, *args, **{**kwargs, "data": row})
 
-        semaphore = kwargs.pop("semaphore_class", Semaphore())
+        return run_batch(send, rows, report_unsent=report_unsent, **options)
+
+    async def _send(self, request_method, *args, **kwargs):
+        kwargs.pop("semaphore", None)
+        stream = kwargs.pop("stream", False)
 
         refresh_token = (
             kwargs.pop("refresh_token", False) is True
@@ -229,108 +306,394 @@ class TapiocaClientExecutor(BaseTapiocaClientExecutor):
         )
         repeat_number = 0
 
-        async with semaphore:
-            response = await self._make_request(
-                request_method, refresh_token, repeat_number, *args, **kwargs
-            )
-
-        return response
-
-    def _get_semaphore_value(self, kwargs):
-        return (
-            kwargs.pop("semaphore", None)
-            or self._api_params.get("semaphore")
-            or self._api.semaphore
+        return await self._make_request(
+            request_method,
+            refresh_token,
+            repeat_number,
+            *args,
+            stream=stream,
+            **kwargs,
         )
 
     async def _make_request(
-        self, request_method, refresh_token=False, repeat_number=0, *args, **kwargs
+        self,
+        request_method,
+        refresh_token=False,
+        repeat_number=0,
+        *args,
+        stream=False,
+        **kwargs,
     ):
         if "url" not in kwargs:
             kwargs["url"] = self._path
 
-        self._request_kwargs = kwargs
-
-        context = self._get_context(
-            request_method=request_method,
-            refresh_token=refresh_token,
-            repeat_number=repeat_number,
-            request_kwargs={**self._request_kwargs},
-        )
-        del context["data"]
+        retry_policy = self._get_retry_policy()
+        attempts = []
+        delay = 0.0
 
-        data = None
-        request_kwargs = context["request_kwargs"]
-        response = context["response"]
+        while True:
+            self._request_kwargs = kwargs
+            self._attempts = attempts
 
-        try:
-            await self.initialize()
-            self._request_kwargs = await coro_wrap(
-                self._api.prepare_request_kwargs, *args, **context
-            )
-            response = await self._session.request(
-                request_method, **self._request_kwargs
-            )
-            context.update({"response": response, "request_kwargs": request_kwargs})
-            data = await coro_wrap(self._api.process_response, **context)
-            context["data"] = data
-        except ResponseProcessException as ex:
-            repeat_number += 1
-
-            self._response = response
-            self._data = getattr(ex, "data", None)
-            self._request_kwargs = request_kwargs
-
-            context.update(
-                {
-                    "response": response,
-                    "request_kwargs": request_kwargs,
-                    "repeat_number": repeat_number,
-                    "data": ex.data,
-                }
+            context = self._get_context(
+                request_method=request_method,
+                refresh_token=refresh_token,
+                repeat_number=repeat_number,
+                request_kwargs={**self._request_kwargs},
+                stream=stream,
             )
+            del context["data"]
+
+            data = None
+            request_kwargs = context["request_kwargs"]
+            response = context["response"]
+            started = monotonic()
+
+            try:
+                await self.initialize()
+                # the slot is taken per attempt, so it isn't held while waiting
+                # to retry or while the authentication is refreshed
+                async with self._client.limiter.acquire(kwargs["url"]):
+                    self._request_kwargs = await coro_wrap(
+                        self._api.prepare_request_kwargs, *args, **context
+                    )
+                    response = await self._session.request(
+                        request_method, **self._request_kwargs
+                    )
+                    context.update(
+                        {"response": response, "request_kwargs": request_kwargs}
+                    )
+                    data = await coro_wrap(self._api.process_response, **context)
+                context["data"] = data
+                self._add_attempt(attempts, started, response.status)
+            except ResponseProcessException as ex:
+                repeat_number += 1
+
+                self._response = response
+                self._data = getattr(ex, "data", None)
+                self._request_kwargs = request_kwargs
+
+                context.update(
+                    {
+                        "response": response,
+                        "request_kwargs": request_kwargs,
+                        "repeat_number": repeat_number,
+                        "data": ex.data,
+                    }
+                )
+
+                status = getattr(ex.response, "status", None)
 
-            if repeat_number > self._api.max_retries_requests:
+                if repeat_number <= self._api.max_retries_requests:
+                    auth_expired = await coro_wrap(
+                        self._api.is_authentication_expired, ex, **context
+                    )
+                    if refresh_token and auth_expired:
+                        self._refresh_data = await coro_wrap(
+                            self._api.refresh_authentication, ex, **context
+                        )
+                        if self._refresh_data:
+                            self._add_attempt(
+                                attempts, started, status, error=self._detach(ex)
+                            )
+                            refresh_token = False
+                            continue
+
+                    if await coro_wrap(self._api.retry_request, ex, **context):
+                        delay = retry_policy.get_delay(
+                            repeat_number, delay, exception=ex, response=response
+                        )
+                        self._add_attempt(
+                            attempts, started, status, delay, self._detach(ex)
+                        )
+                        refresh_token = False
+                        if delay > 0:
+                            await sleep(delay)
+                        continue
+
+                # failed requests have no response, the attempts are kept
+                # on the exception instead
+                self._add_attempt(attempts, started, status, error=ex)
+                ex.attempts = attempts
                 await coro_wrap(self._api.error_handling, ex, **context)
 
-            propagate_exception = True
+            except Exception as ex:  # noqa: PIE786
+                self._add_attempt(attempts, started, error=ex)
+                ex.attempts = attempts
+                await coro_wrap(self._api.error_handling, ex, *args, **context)
 
-            auth_expired = await coro_wrap(
-                self._api.is_authentication_expired, ex, **context
+            return self._wrap_in_tapioca_response(
+                data=data,
+                response=response,
+                request_kwargs=self._request_kwargs,
+                attempts=attempts,
             )
-            if refresh_token and auth_expired:
-                self._refresh_data = await coro_wrap(
-                    self._api.refresh_authentication, ex, **context
-                )
-                if self._refresh_data:
-                    propagate_exception = False
-                    return await self._make_request(
-                        request_method,
-                        refresh_token=False,
-                        repeat_number=repeat_number,
-                        *args,
-                        **kwargs,
-                    )
 
-            if await coro_wrap(self._api.retry_request, ex, **context):
-                propagate_exception = False
-                return await self._make_request(
-                    request_method,
-                    refresh_token=False,
-                    repeat_number=repeat_number,
-                    *args,
-                    **kwargs,
-                )
+    def _get_retry_policy(self):
+        return self._api_params.get("retry_policy") or self._api.retry_policy
 
-            if propagate_exception:
-                await coro_wrap(self._api.error_handling, ex, **context)
+    @staticmethod
+    def _detach(exception):
+        # the traceback of a retried error keeps the frames of the attempt alive,
+        # with their context and response data
+        return exception.with_traceback(None)
+
+    @staticmethod
+    def _add_attempt(attempts, started, status=None, delay=0.0, error=None):
+        attempts.append(
+            RequestAttempt(len(attempts), status, monotonic() - started, delay, error)
+        )
+
+    async def _iter_page_items(
+        self,
+        pages,
+        max_pages=None,
+        max_items=None,
+        raw=False,
+        checkpoint=None,
+        on_checkpoint=None,
+    ):
+        page_count = checkpoint["page_count"] if checkpoint else 0
+        item_count = checkpoint["item_count"] if checkpoint else 0
+
+        try:
+            async for executor in pages:
+                iterator_list = executor._get_iterator_list()
+                if not iterator_list:
+                    break
+
+                page_item_count = item_count
+                batches = self._iter_item_batches(iterator_list)
+                try:
+                    async for batch in batches:
+                        for item in batch:
+                            if self._reached_max_limits(
+                                page_count, item_count, max_pages, max_items
+                            ):
+                                break
+                            # wrapping every item rebuilds the whole context,
+                            # skip it when only the data is needed
+                            if raw:
+                                yield item
+                            else:
+                                yield executor._wrap_in_tapioca_response(data=item)
+                            item_count += 1
+                        else:
+                            continue
+                        break
+                    else:
+                        if item_count == page_item_count:
+                            break  # a streamed page turned out to be empty
+                        page_count += 1
+                        if on_checkpoint is not None:
+                            await executor._save_checkpoint(
+                                on_checkpoint, page_count, item_count
+                            )
+                        if not self._reached_max_limits(
+                            page_count, item_count, max_pages, max_items
+                        ):
+                            continue
+                finally:
+                    await batches.aclose()
+                break
+        finally:
+            await pages.aclose()
+
+    @staticmethod
+    async def _iter_item_batches(iterator_list):
+        # items are handed over in batches, so that the items of a list don't
+        # each go through the async iteration
+        if hasattr(iterator_list, "iter_batches"):
+            batches = iterator_list.iter_batches()
+        elif hasattr(iterator_list, "__aiter__"):
+            batches = ((item,) async for item in iterator_list)
+        else:
+            yield iterator_list
+            return
+        async for batch in iterate(batches):
+            yield batch
+
+    async def _iter_page_lists(
+        self,
+        pages,
+        max_pages=None,
+        max_items=None,
+        checkpoint=None,
+        on_checkpoint=None,
+    ):
+        page_count = checkpoint["page_count"] if checkpoint else 0
+        item_count = checkpoint["item_count"] if checkpoint else 0
+
+        try:
+            async for executor in pages:
+                if self._reached_max_limits(
+                    page_count, item_count, max_pages, max_items
+                ):
+                    break
+
+                iterator_list = executor._get_iterator_list()
+                if hasattr(iterator_list, "__aiter__"):
+                    iterator_list = [item async for item in iterator_list]
+                if not iterator_list:
+                    break
+
+                completed = True
+                if (
+                    max_items is not None
+                    and len(iterator_list) > max_items - item_count
+                ):
+                    iterator_list = iterator_list[: max_items - item_count]
+                    completed = False
+                item_count += len(iterator_list)
 
+                yield iterator_list
+
+                if not completed:
+                    break
+                page_count += 1
+                if on_checkpoint is not None:
+                    await executor._save_checkpoint(
+                        on_checkpoint, page_count, item_count
+                    )
+                if self._reached_max_limits(
+                    page_count, item_count, max_pages, max_items
+                ):
+                    break
+        finally:
+            await pages.aclose()
+
+    def _iter_pages(self, max_pages=None, prefetch=0, checkpoint=None):
+        if prefetch:
+            return self._iter_prefetched_pages(max_pages, prefetch, checkpoint)
+        return self._iter_fetched_pages(max_pages, checkpoint)
+
+    async def _iter_fetched_pages(self, max_pages=None, checkpoint=None):
+        page_count = checkpoint["page_count"] if checkpoint else 0
+        if self._reached_max_limits(page_count, 0, max_pages, None):
+            return
+        executor = await self._get_first_page(checkpoint)
+        while executor is not None:
+            yield executor
+            page_count += 1
+            if self._reached_max_limits(page_count, 0, max_pages, None):
+                break
+            executor = await executor._get_next_page()
+
+    async def _iter_prefetched_pages(self, max_pages, prefetch, checkpoint=None):
+        page_count = checkpoint["page_count"] if checkpoint else 0
+        if self._reached_max_limits(page_count, 0, max_pages, None):
+            return
+        executor = await self._get_first_page(checkpoint)
+        if executor is None:
+            return
+
+        # the next pages are fetched in the background while the current one
+        # is consumed, never more than `prefetch` pages ahead
+        queue = Queue()
+        slots = Semaphore(prefetch)
+        task = ensure_future(
+            executor._prefetch_pages(queue, slots, max_pages, page_count + 1)
+        )
+        try:
+            yield executor
+            while True:
+                executor, error = await queue.get()
+                if error is not None:
+                    raise error
+                if executor is None:
+                    break
+                slots.release()
+                yield executor
+        finally:
+            task.cancel()
+            await gather(task, return_exceptions=True)
+
+    async def _prefetch_pages(self, queue, slots, max_pages, page_count=1):
+        executor = self
+        try:
+            while not self._reached_max_limits(page_count, 0, max_pages, None):
+                if not executor._get_iterator_list():
+                    break
+                await slots.acquire()
+                executor = await executor._get_next_page()
+                if executor is None:
+                    break
+                await queue.put((executor, None))
+                page_count += 1
         except Exception as ex:  # noqa: PIE786
-            await coro_wrap(self._api.error_handling, ex, *args, **context)
+            await queue.put((None, ex))
+            return
+        await queue.put((None, None))
+
+    async def _iter_parallel_pages(self, max_pages=None, ordered=True, window=None):
+        yield self
+        if self._reached_max_limits(1, 0, max_pages, None):
+            return
+
+        pages_request_kwargs = await self._get_iterator_pages_request_kwargs()
+        if pages_request_kwargs is None:
+            # the adapter can't list the pages up front, walk them one by one
+            pages = self._iter_fetched_pages(max_pages)
+            await pages.__anext__()
+        else:
+            if max_pages is not None:
+                pages_request_kwargs = islice(pages_request_kwargs, max_pages - 1)
+
+            def send(request_kwargs):
+                return self._wrap_in_tapioca_executor().get(**request_kwargs)
+
+            window = window or self._client.limiter.limit
+            # in order, at most window pages are fetched ahead of the first one
+            # still in flight, so a slow page doesn't buffer all the others
+            batch = run_batch(
+                send,
+                pages_request_kwargs,
+                window,
+                ordered,
+                reorder_buffer=window if ordered else None,
+            )
+            pages = self._iter_batch_pages(iter_batch(batch))
+        try:
+            async for executor in pages:
+                yield executor
+        finally:
+            await pages.aclose()
 
-        return self._wrap_in_tapioca_response(
-            data=data, response=response, request_kwargs=self._request_kwargs
+    @staticmethod
+    async def _iter_batch_pages(batch):
+        try:
+            async for _, response in batch:
+                yield response()
+        finally:
+            await batch.aclose()
+
+    async def _get_first_page(self, checkpoint=None):
+        if not checkpoint:
+            return self
+        if not checkpoint["request_kwargs"]:
+            return None
+        response = await self._wrap_in_tapioca_executor().get(
+            **checkpoint["request_kwargs"]
         )
+        return response()
+
+    async def _save_checkpoint(self, on_checkpoint, page_count, item_count):
+        # everything needed to resume the iteration after this page
+        checkpoint = {
+            "request_kwargs": await self._get_iterator_next_request_kwargs() or None,
+            "page_count": page_count,
+            "item_count": item_count,
+        }
+        await coro_wrap(on_checkpoint, checkpoint)
+
+    async def _get_next_page(self):
+        next_request_kwargs = await self._get_iterator_next_request_kwargs()
+        if not next_request_kwargs:
+            return None
+        # a new executor is used, so that responses already yielded from this
+        # page keep their context while the next one is requested
+        response = await self._wrap_in_tapioca_executor().get(**next_request_kwargs)
+        return response()
 
     @staticmethod
     def _reached_max_limits(page_count, item_count, max_pages, max_items):
@@ -341,6 +704,11 @@ class TapiocaClientExecutor(BaseTapiocaClientExecutor):
     def _get_iterator_list(self):
         return self._api.get_iterator_list(**self._get_context())
 
+    async def _get_iterator_pages_request_kwargs(self):
+        return await coro_wrap(
+            self._api.get_iterator_pages_request_kwargs, **self._get_context()
+        )
+
     async def _get_iterator_next_request_kwargs(self):
         return await coro_wrap(
             self._api.get_iterator_next_request_kwargs, **self._get_context()
@@ -367,6 +735,7 @@ class TapiocaClientResponse(BaseTapiocaClientResponse):
                 "url",
                 "status",
                 "request_kwargs",
+                "attempts",
                 "data",
             ]
         )
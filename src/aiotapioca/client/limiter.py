@@ -0,0 +1,83 @@
+from asyncio import Semaphore
+from contextlib import asynccontextmanager
+from time import monotonic
+from urllib.parse import urlsplit
+
+
+__all__ = ("RequestLimiter",)
+
+
+class RequestLimiter:
+    def __init__(self, limit=None, limit_per_host=None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._semaphore = None
+        self._host_semaphores = {}
+        self.waiting = 0
+        self.in_flight = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def __str__(self):
+        return (
+            f"<{type(self).__name__} object: limit={self.limit}"
+            f" limit_per_host={self.limit_per_host}"
+            f" in_flight={self.in_flight} waiting={self.waiting}>"
+        )
+
+    def __getstate__(self):
+        # asyncio primitives are bound to an event loop and can't be pickled
+        state = self.__dict__.copy()
+        state.update({"_semaphore": None, "_host_semaphores": {}})
+        return state
+
+    @property
+    def average_wait(self):
+        if not self.acquired:
+            return 0.0
+        return self.total_wait / self.acquired
+
+    @asynccontextmanager
+    async def acquire(self, url=None):
+        semaphores = self._get_semaphores(url)
+        acquired = []
+        started = monotonic()
+        self.waiting += 1
+        try:
+            for semaphore in semaphores:
+                await semaphore.acquire()
+                acquired.append(semaphore)
+        except BaseException:
+            for semaphore in acquired:
+                semaphore.release()
+            raise
+        finally:
+            self.waiting -= 1
+
+        wait = monotonic() - started
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.in_flight += 1
+        try:
+            yield self
+        finally:
+            self.in_flight -= 1
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+    def _get_semaphores(self, url=None):
+        # the host slot is taken first, so that a request waiting for a busy host
+        # doesn't hold one of the client-wide slots
+        semaphores = []
+        if self.limit_per_host and url:
+            host = urlsplit(str(url)).netloc
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = Semaphore(self.limit_per_host)
+            semaphores.append(self._host_semaphores[host])
+        if self.limit:
+            if self._semaphore is None:
+                self._semaphore = Semaphore(self.limit)
+            semaphores.append(self._semaphore)
+        return semaphores
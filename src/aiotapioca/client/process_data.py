@@ -1,10 +1,11 @@
-import re
 import webbrowser
 from collections import OrderedDict
-from functools import partial
+from functools import lru_cache, partial
 from inspect import isclass, isfunction, ismethod
 from typing import TYPE_CHECKING
 
+from aiotapioca.utils import to_camel_case, to_snake_case
+
 
 if TYPE_CHECKING:
     import json
@@ -16,6 +17,16 @@ else:
 __all__ = ("ProcessData",)
 
 
+@lru_cache(maxsize=4096)
+def _get_fallback_names(name):
+    # the name as requested, then its camelCase and PascalCase variants
+    camel_case_name = to_camel_case(name)
+    names = [name, camel_case_name]
+    if camel_case_name:
+        names.append(camel_case_name[0].upper() + camel_case_name[1:])
+    return tuple(dict.fromkeys(names))
+
+
 class ProcessData:
     def __init__(self, api, data, resource):
         self._api = api
@@ -87,41 +98,21 @@ class ProcessData:
         return cls(api, data, resource)
 
     def _to_camel_case(self, name):
-        """
-        Convert a snake_case string in CamelCase.
-        http://stackoverflow.com/questions/19053707/convert-snake-case-snake-case-to-lower-camel-case-lowercamelcase
-        -in-python
-        """
         if isinstance(name, int):
             return name
-        components = name.split("_")
-        return components[0] + "".join(x.title() for x in components[1:])
+        return to_camel_case(name)
 
     def _to_snake_case(self, name):
-        """
-        Convert to snake_case.
-        http://stackoverflow.com/questions/19053707/convert-snake-case-snake-case-to-lower-camel-case-lowercamelcase
-        -in-python
-        """
-        name = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
-        return re.sub("([a-z0-9])([A-Z])", r"\1_\2", name).lower()
+        return to_snake_case(name)
 
     def _get_client_from_name_or_fallback(self, name):
-        client = self._get_client_from_name(name)
-        if client is not None:
-            return client
-
-        camel_case_name = self._to_camel_case(name)
-        client = self._get_client_from_name(camel_case_name)
-        if client is not None:
-            return client
-
-        normal_camel_case_name = camel_case_name[0].upper()
-        normal_camel_case_name += camel_case_name[1:]
+        if not isinstance(name, str):
+            return self._get_client_from_name(name)
 
-        client = self._get_client_from_name(normal_camel_case_name)
-        if client is not None:
-            return client
+        for fallback_name in _get_fallback_names(name):
+            client = self._get_client_from_name(fallback_name)
+            if client is not None:
+                return client
 
         return None
 
@@ -0,0 +1,65 @@
+from concurrent.futures import Executor, Future
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+
+
+__all__ = ("InlineExecutor", "decode_for_transfer", "load_transferred")
+
+
+class InlineExecutor(Executor):
+    """
+    Runs the submitted calls immediately in the calling thread, that is on
+    the event loop when used by an adapter.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+        return future
+
+
+class _PickledChunks(list):
+    pass
+
+
+def _pack(value, chunk_size, depth=1):
+    if isinstance(value, list) and len(value) > chunk_size:
+        return _PickledChunks(
+            dumps(value[index : index + chunk_size], HIGHEST_PROTOCOL)
+            for index in range(0, len(value), chunk_size)
+        )
+    if isinstance(value, dict) and depth:
+        return {key: _pack(item, chunk_size, depth - 1) for key, item in value.items()}
+    return value
+
+
+def _unpack(value, depth=1):
+    if isinstance(value, _PickledChunks):
+        unpacked = []
+        for chunk in value:
+            unpacked.extend(loads(chunk))
+        return unpacked
+    if (
+        isinstance(value, dict)
+        and depth
+        and any(isinstance(item, _PickledChunks) for item in value.values())
+    ):
+        return {key: _unpack(item, depth - 1) for key, item in value.items()}
+    return value
+
+
+def decode_for_transfer(decoder, data, chunk_size=1000):
+    """
+    Runs decoder in a worker process. Large lists, at the top level or in
+    the top level dict, are sent back as separately pickled chunks so that
+    load_transferred doesn't hold the GIL for the whole result at once.
+    """
+    return _pack(decoder(data), chunk_size)
+
+
+def load_transferred(data):
+    return _unpack(data)
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from typing import NamedTuple, Optional
+
+
+__all__ = (
+    "RequestAttempt",
+    "BaseRetryPolicy",
+    "FixedRetryPolicy",
+    "ExponentialRetryPolicy",
+    "DecorrelatedJitterRetryPolicy",
+    "RetryAfterRetryPolicy",
+)
+
+
+class RequestAttempt(NamedTuple):
+    number: int
+    status: Optional[int]
+    elapsed: float
+    delay: float
+    error: Optional[BaseException]
+
+
+class BaseRetryPolicy:
+    """
+    Retries immediately, without any delay between attempts.
+    """
+
+    def get_delay(self, repeat_number, previous_delay=0.0, **kwargs):
+        return 0.0
+
+
+class FixedRetryPolicy(BaseRetryPolicy):
+    def __init__(self, delay=1.0):
+        self.delay = delay
+
+    def get_delay(self, repeat_number, previous_delay=0.0, **kwargs):
+        return self.delay
+
+
+class ExponentialRetryPolicy(BaseRetryPolicy):
+    def __init__(self, base=0.1, factor=2.0, max_delay=30.0, jitter=False):
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def get_delay(self, repeat_number, previous_delay=0.0, **kwargs):
+        # the delay stops growing long before the exponent gets large enough
+        # to overflow a float
+        exponent = min(repeat_number - 1, 1024)
+        try:
+            delay = min(self.max_delay, self.base * self.factor**exponent)
+        except OverflowError:
+            delay = self.max_delay
+        if self.jitter:
+            return uniform(0, delay)
+        return delay
+
+
+class DecorrelatedJitterRetryPolicy(BaseRetryPolicy):
+    """
+    https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+    """
+
+    def __init__(self, base=0.1, max_delay=30.0):
+        self.base = base
+        self.max_delay = max_delay
+
+    def get_delay(self, repeat_number, previous_delay=0.0, **kwargs):
+        upper = max(self.base, previous_delay * 3)
+        return min(self.max_delay, uniform(self.base, upper))
+
+
+class RetryAfterRetryPolicy(BaseRetryPolicy):
+    """
+    Honours the Retry-After header of the response (delta-seconds or HTTP-date),
+    falling back to another policy when the header is missing or invalid.
+    """
+
+    def __init__(self, fallback=None, max_delay=120.0):
+        self.fallback = fallback or BaseRetryPolicy()
+        self.max_delay = max_delay
+
+    def get_delay(self, repeat_number, previous_delay=0.0, response=None, **kwargs):
+        delay = self.parse_retry_after(response)
+        if delay is None:
+            return self.fallback.get_delay(
+                repeat_number, previous_delay, response=response, **kwargs
+            )
+        return min(self.max_delay, delay)
+
+    @staticmethod
+    def parse_retry_after(response):
+        value = getattr(response, "headers", {}).get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
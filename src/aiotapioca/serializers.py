@@ -1,38 +1,123 @@
 from decimal import Decimal
+from typing import Any, Dict
 
 
 __all__ = ("BaseSerializer", "SimpleSerializer")
 
 
 class BaseSerializer:
+    # type -> name of the serialize method, None when the value is kept as is,
+    # or dict/list for the containers walked by _serialize_tree
+    _serialize_methods: Dict[type, Any] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._serialize_methods = {}
+
     def deserialize(self, method_name, value, **kwargs):
         if hasattr(self, method_name):
             return getattr(self, method_name)(value, **kwargs)
         raise NotImplementedError("Desserialization method not found")
 
     def serialize_dict(self, data):
-        serialized = {}
+        return self._serialize_tree(data, dict)
 
-        for key, value in data.items():
-            serialized[key] = self.serialize(value)
+    def serialize_list(self, data):
+        return self._serialize_tree(data, list)
 
-        return serialized
+    def serialize(self, data):
+        data_type = type(data)
+        try:
+            method = self._serialize_methods[data_type]
+        except KeyError:
+            method = self._resolve_serialize_method(data_type)
 
-    def serialize_list(self, data):
-        serialized = []
-        for item in data:
-            serialized.append(self.serialize(item))
+        if method is None:
+            return data
+        if method is dict or method is list:
+            return self._serialize_tree(data, method)
+        return getattr(self, method)(data)
 
-        return serialized
+    def json_default(self, data):
+        """
+        Can be used as the default callback of json.dumps and compatible
+        encoders, which call it only for the values they can't encode.
+        """
+        data_type = type(data)
+        try:
+            method = self._serialize_methods[data_type]
+        except KeyError:
+            method = self._resolve_serialize_method(data_type)
 
-    def serialize(self, data):
-        data_type = type(data).__name__
+        if method is None:
+            raise TypeError(
+                f"Object of type {data_type.__name__} is not JSON serializable"
+            )
+        if method is dict or method is list:
+            return self._serialize_tree(data, method)
+        return getattr(self, method)(data)
+
+    @classmethod
+    def _resolve_serialize_method(cls, data_type):
+        method = None
+        for base in data_type.__mro__:
+            name = ("serialize_" + base.__name__).lower()
+            function = getattr(cls, name, None)
+            if function is None:
+                continue
+            if function is BaseSerializer.serialize_dict:
+                method = dict
+            elif function is BaseSerializer.serialize_list:
+                method = list
+            else:
+                method = name
+            break
+        cls._serialize_methods[data_type] = method
+        return method
 
-        serialize_method = ("serialize_" + data_type).lower()
-        if hasattr(self, serialize_method):
-            return getattr(self, serialize_method)(data)
+    def _serialize_tree(self, data, container_type):
+        # iterative, so that deeply nested data can't exceed the recursion limit
+        methods = self._serialize_methods
+        resolve = self._resolve_serialize_method
+        serialized = container_type()
+        # id of every container walked -> id of its parent
+        parents = {id(data): None}
+        stack = [(data, serialized)]
+        while stack:
+            source, target = stack.pop()
+            source_id = id(source)
+            is_dict = type(target) is dict
+            for key, value in source.items() if is_dict else enumerate(source):
+                value_type = type(value)
+                try:
+                    method = methods[value_type]
+                except KeyError:
+                    method = resolve(value_type)
 
-        return data
+                if method is None:
+                    pass
+                elif method is dict or method is list:
+                    value_id = id(value)
+                    if value_id in parents:
+                        # shared containers are serialized again, but one of
+                        # their own ancestors would be walked forever
+                        ancestor_id = source_id
+                        while ancestor_id is not None:
+                            if ancestor_id == value_id:
+                                raise ValueError("Circular reference detected")
+                            ancestor_id = parents[ancestor_id]
+                    parents[value_id] = source_id
+                    child = method()
+                    stack.append((value, child))
+                    value = child
+                else:
+                    value = getattr(self, method)(value)
+
+                if is_dict:
+                    target[key] = value
+                else:
+                    target.append(value)
+        return serialized
 
 
 class SimpleSerializer(BaseSerializer):
@@ -0,0 +1,313 @@
+import re
+from asyncio import get_running_loop
+from codecs import getincrementaldecoder
+from io import IOBase
+from json import JSONDecodeError, JSONDecoder
+from os import PathLike
+from typing import TYPE_CHECKING, Optional
+
+
+if TYPE_CHECKING:
+    import json
+else:
+    from aiotapioca.utils import get_json_lib
+
+    json = get_json_lib()
+
+
+__all__ = (
+    "BaseItemStream",
+    "JSONArrayParser",
+    "JSONArrayStream",
+    "NDJSONParser",
+    "NDJSONStream",
+    "ResponseStream",
+    "is_stream_body",
+    "open_stream_body",
+)
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_END = frozenset(" \t\n\r,]")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRING_END = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_BRACKETS = re.compile(r"[{}\[\]]")
+
+
+class JSONArrayParser:
+    """
+    Incrementally decodes the items of a JSON array fed in chunks of bytes.
+    Only the text of the item being decoded is kept in memory.
+    """
+
+    def __init__(self):
+        self._decoder = JSONDecoder()
+        self._text_decoder = getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        # text of an item spanning several chunks, joined once it can be complete
+        self._pending = None
+        self._depth = 0
+        self._in_string = self._escape = False
+        self._started = False
+        self._finished = False
+        self._expect_item = True
+        self._first_item = True
+
+    def feed(self, chunk, final=False):
+        text = self._text_decoder.decode(chunk, final)
+        if self._pending is not None:
+            self._pending.append(text)
+            if not final and not self._scan(text):
+                return []
+            buffer = "".join(self._pending)
+            self._pending = None
+        else:
+            buffer = self._buffer + text
+        items = []
+        incomplete = False
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if self._finished:
+                raise ValueError("Extra data after the JSON array")
+            if not self._started:
+                if char != "[":
+                    raise ValueError("The response data isn't a JSON array")
+                self._started = True
+                pos += 1
+            elif char == "]" and (self._first_item or not self._expect_item):
+                self._finished = True
+                pos += 1
+            elif not self._expect_item:
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in the JSON array: {char}")
+                self._expect_item = True
+                pos += 1
+            else:
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except JSONDecodeError:
+                    if final:
+                        raise
+                    incomplete = True
+                    break  # the item continues in the next chunk
+                if not final and (end == len(buffer) or buffer[end] not in _END):
+                    break  # a number could continue in the next chunk
+                items.append(item)
+                self._expect_item = self._first_item = False
+                pos = end
+        self._buffer = buffer[pos:]
+        if incomplete and self._buffer[0] in '{["':
+            # decoding the item again on every chunk would be quadratic, its end
+            # is looked for in the new text only
+            self._depth = 0
+            self._in_string = self._escape = False
+            if not self._scan(self._buffer):
+                self._pending = [self._buffer]
+                self._buffer = ""
+        if final and not self._finished:
+            raise ValueError("Unterminated JSON array")
+        return items
+
+    def _scan(self, text):
+        """
+        Follows the nesting of the pending item through text, returns True
+        when the item may end in it.
+        """
+        pos = 0
+        if self._in_string:
+            if self._escape:
+                if not text:
+                    return False
+                pos, self._escape = 1, False
+            match = _STRING_END.match(text, pos)
+            if match is None:
+                self._escape = _ends_with_escape(text[pos:])
+                return False
+            pos = match.end()
+            self._in_string = False
+            if not self._depth:
+                return True
+        # brackets are counted in bulk once the complete strings are removed,
+        # and followed one by one only where the item may end
+        segment = _STRING.sub("", text[pos:])
+        quote = segment.find('"')
+        if quote != -1:
+            self._in_string = True
+            self._escape = _ends_with_escape(segment[quote + 1 :])
+            segment = segment[:quote]
+        closing = segment.count("}") + segment.count("]")
+        if self._depth > closing:
+            self._depth += segment.count("{") + segment.count("[") - closing
+            return False
+        for match in _BRACKETS.finditer(segment):
+            if match.group() in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if not self._depth:
+                    return True
+        return False
+
+
+def _ends_with_escape(text):
+    return (len(text) - len(text.rstrip("\\"))) % 2 == 1
+
+
+class NDJSONParser:
+    """
+    Incrementally decodes newline-delimited JSON (JSON Lines) fed in chunks
+    of bytes. Only the incomplete last line is kept in memory.
+    """
+
+    def __init__(self):
+        # parts of the incomplete last line, only the new chunks are searched
+        self._pending = []
+
+    def feed(self, chunk, final=False):
+        lines = chunk.split(b"\n")
+        if self._pending:
+            if len(lines) == 1 and not final:
+                self._pending.append(chunk)
+                return []
+            self._pending.append(lines[0])
+            lines[0] = b"".join(self._pending)
+            self._pending = []
+        if not final:
+            last_line = lines.pop()
+            if last_line:
+                self._pending.append(last_line)
+        return [json.loads(line) for line in lines if line.strip()]
+
+
+class BaseItemStream:
+    """
+    Async iterable over the items of a response, decoded by parser_class as
+    the body is received. It can be iterated once.
+    """
+
+    parser_class: Optional[type] = None
+
+    def __init__(self, response, convert=None, chunk_size=64 * 1024):
+        self.response = response
+        self.convert = convert
+        self.chunk_size = chunk_size
+        self.count = 0
+        self._consumed = False
+
+    def __str__(self):
+        return f"<{type(self).__name__} object: {self.count} items read>"
+
+    def __aiter__(self):
+        return self._iter_items()
+
+    def iter_batches(self):
+        """
+        Async iterator over lists of the items decoded from each chunk.
+        """
+        if self._consumed:
+            raise RuntimeError("The response stream has already been consumed")
+        self._consumed = True
+        return self._iter_batches()
+
+    async def _iter_items(self):
+        batches = self.iter_batches()
+        try:
+            async for batch in batches:
+                for item in batch:
+                    yield item
+        finally:
+            await batches.aclose()
+
+    async def _iter_batches(self):
+        parser = self.parser_class()
+        try:
+            async for chunk in self.response.content.iter_chunked(self.chunk_size):
+                items = parser.feed(chunk)
+                if items:
+                    yield self._convert(items)
+            items = parser.feed(b"", final=True)
+            if items:
+                yield self._convert(items)
+        finally:
+            self.response.release()
+
+    def _convert(self, items):
+        self.count += len(items)
+        if self.convert is not None:
+            return [self.convert(item) for item in items]
+        return items
+
+
+class JSONArrayStream(BaseItemStream):
+    parser_class = JSONArrayParser
+
+
+class NDJSONStream(BaseItemStream):
+    parser_class = NDJSONParser
+
+
+class ResponseStream:
+    """
+    The body of a response, read in chunks as it is received. The connection
+    is released once the body is consumed or the stream is closed.
+    """
+
+    def __init__(self, response, chunk_size=64 * 1024):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.closed = False
+
+    def __str__(self):
+        return f"<{type(self).__name__} object: {self.response.url}>"
+
+    def __aiter__(self):
+        return self.iter_chunked()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def iter_chunked(self, chunk_size=None):
+        try:
+            async for chunk in self.response.content.iter_chunked(
+                chunk_size or self.chunk_size
+            ):
+                yield chunk
+        finally:
+            self.close()
+
+    async def save_to(self, path, chunk_size=None):
+        # the file is written from the default thread pool, so that a slow
+        # disk doesn't block the event loop
+        loop = get_running_loop()
+        size = 0
+        file = await loop.run_in_executor(None, open, path, "wb")
+        try:
+            async for chunk in self.iter_chunked(chunk_size):
+                await loop.run_in_executor(None, file.write, chunk)
+                size += len(chunk)
+        finally:
+            await loop.run_in_executor(None, file.close)
+        return size
+
+    def close(self):
+        self.response.release()
+        self.closed = True
+
+
+def is_stream_body(value):
+    return isinstance(value, (IOBase, PathLike)) or hasattr(value, "__aiter__")
+
+
+def open_stream_body(value):
+    # paths are opened for every attempt of a request, so unlike file objects
+    # and async iterables they can be sent again when a request is retried
+    if isinstance(value, PathLike):
+        return open(value, "rb")
+    return value
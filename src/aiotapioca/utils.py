@@ -1,8 +1,26 @@
+import re
 from contextlib import suppress
+from datetime import date, time
+from decimal import Decimal
+from functools import lru_cache
 from inspect import iscoroutinefunction
+from itertools import chain
+from string import Formatter
+from sys import intern
+from urllib.parse import quote
+from uuid import UUID
 
 
-__all__ = ("coro_wrap",)
+__all__ = (
+    "coro_wrap",
+    "iterate",
+    "URLTemplate",
+    "compile_url_template",
+    "to_camel_case",
+    "to_snake_case",
+    "normalize_keys",
+    "estimate_size",
+)
 
 
 async def coro_wrap(func, *args, **kwargs):
@@ -13,6 +31,21 @@ async def coro_wrap(func, *args, **kwargs):
     return result
 
 
+async def iterate(iterable):
+    if hasattr(iterable, "__aiter__"):
+        iterator = iterable.__aiter__()
+        try:
+            async for item in iterator:
+                yield item
+        finally:
+            # closes async generators left suspended when the iteration stops
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+    else:
+        for item in iterable:
+            yield item
+
+
 def get_json_lib():
     json = None
     with suppress(ImportError):
@@ -26,3 +59,157 @@ def get_json_lib():
         import json
 
     return json
+
+
+_is_unreserved = re.compile(r"[A-Za-z0-9_.~-]*").fullmatch
+
+
+class URLTemplate:
+    def __init__(self, template):
+        self.template = template
+        self._parts = []
+        # templates using positional fields, attribute or index access, format
+        # specs or conversions are filled by str.format
+        self._simple = True
+        for literal, name, format_spec, conversion in Formatter().parse(template):
+            if name is not None and (
+                format_spec or conversion or not name.isidentifier()
+            ):
+                self._simple = False
+            self._parts.append((literal, name))
+        self.names = tuple(dict.fromkeys(name for _, name in self._parts if name))
+
+    def __str__(self):
+        return f"<{type(self).__name__} object: {self.template}>"
+
+    def fill(self, url_params, quote_params=True):
+        if not self._simple:
+            return self.template.format(**url_params)
+
+        url = []
+        try:
+            for literal, name in self._parts:
+                url.append(literal)
+                if name is not None:
+                    value = url_params[name]
+                    value = value if type(value) is str else str(value)
+                    if quote_params and not _is_unreserved(value):
+                        value = quote(value, safe="")
+                    url.append(value)
+        except KeyError:
+            missing = [name for name in self.names if name not in url_params]
+            raise KeyError(
+                f"Missing URL params for {self.template}: {', '.join(missing)}"
+            ) from None
+        return "".join(url)
+
+
+@lru_cache(maxsize=1024)
+def compile_url_template(template):
+    return URLTemplate(template)
+
+
+_FIRST_CAP_RE = re.compile("(.)([A-Z][a-z]+)")
+_ALL_CAP_RE = re.compile("([a-z0-9])([A-Z])")
+
+
+@lru_cache(maxsize=4096)
+def to_camel_case(name):
+    """
+    Convert a snake_case string in CamelCase.
+    http://stackoverflow.com/questions/19053707/convert-snake-case-snake-case-to-lower-camel-case-lowercamelcase
+    -in-python
+    """
+    components = name.split("_")
+    return components[0] + "".join(x.title() for x in components[1:])
+
+
+@lru_cache(maxsize=4096)
+def to_snake_case(name):
+    """
+    Convert to snake_case.
+    http://stackoverflow.com/questions/19053707/convert-snake-case-snake-case-to-lower-camel-case-lowercamelcase
+    -in-python
+    """
+    name = _FIRST_CAP_RE.sub(r"\1_\2", name)
+    return _ALL_CAP_RE.sub(r"\1_\2", name).lower()
+
+
+def normalize_keys(data, normalize_key=to_snake_case):
+    """
+    Passes every key of the dicts in a decoded payload through normalize_key.
+    Each distinct key is converted once and the results are interned, so the
+    keys repeated across a large list share a single string.
+    """
+    keys = {}
+    # the objects of a list usually share the same keys, in the same order
+    layouts = {}
+
+    def convert(key):
+        if type(key) is not str:
+            return key
+        new_key = keys.get(key)
+        if new_key is None:
+            new_key = keys[key] = intern(normalize_key(key))
+        return new_key
+
+    def rename(mapping):
+        layout = tuple(mapping)
+        new_layout = layouts.get(layout)
+        if new_layout is None:
+            new_layout = layouts[layout] = tuple(map(convert, layout))
+        return dict(zip(new_layout, mapping.values()))
+
+    if isinstance(data, dict):
+        data = rename(data)
+    elif not isinstance(data, list):
+        return data
+
+    # lists are updated in place, dicts are replaced by their renamed copies
+    stack = [data]
+    while stack:
+        container = stack.pop()
+        items = (
+            container.items() if isinstance(container, dict) else enumerate(container)
+        )
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                if isinstance(value, dict):
+                    value = container[key] = rename(value)
+                stack.append(value)
+    return data
+
+
+_SCALAR_TYPES = (int, float, Decimal, date, time, UUID)
+
+
+def estimate_size(data, limit):
+    """
+    Rough size in bytes of data once encoded, counting up to limit only,
+    so that the cost doesn't depend on the size of the data. Objects of
+    unknown types, e.g. models, count as limit.
+    """
+    size = 0
+    # containers are walked through iterators, so that they are never copied
+    stack = [iter((data,))]
+    while stack:
+        for value in stack[-1]:
+            if isinstance(value, (str, bytes, bytearray)):
+                size += len(value) + 2
+            elif value is None or isinstance(value, _SCALAR_TYPES):
+                size += 8
+            elif isinstance(value, dict):
+                size += 2
+                stack.append(chain.from_iterable(value.items()))
+                break
+            elif isinstance(value, (list, tuple)):
+                size += 2
+                stack.append(iter(value))
+                break
+            else:
+                return max(size, limit)
+            if size >= limit:
+                return size
+        else:
+            stack.pop()
+    return size
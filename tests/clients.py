@@ -59,6 +59,51 @@ class SimpleClientAdapter(TapiocaAdapterJSON):
 SimpleClient = generate_wrapper_from_adapter(SimpleClientAdapter)
 
 
+class OffsetPagingClientAdapter(SimpleClientAdapter):
+    def get_iterator_next_request_kwargs(
+        self, request_kwargs, data, response, **kwargs
+    ):
+        offset = data["offset"] + data["limit"]
+        if offset < data["total"]:
+            return {**request_kwargs, "params": {"offset": offset}}
+
+    def get_iterator_pages_request_kwargs(
+        self, request_kwargs, data, response, **kwargs
+    ):
+        return [
+            {**request_kwargs, "params": {"offset": offset}}
+            for offset in range(data["limit"], data["total"], data["limit"])
+        ]
+
+
+OffsetPagingClient = generate_wrapper_from_adapter(OffsetPagingClientAdapter)
+
+
+class StreamArrayClientAdapter(SimpleClientAdapter):
+    resource_mapping = {
+        **RESOURCE_MAPPING,
+        "stream": {
+            "resource": "stream/",
+            "docs": "http://www.example.org/stream",
+            "stream_array": True,
+        },
+    }
+    normalize_response_keys = True
+
+    def get_iterator_list(self, data, **kwargs):
+        return data
+
+    def get_iterator_next_request_kwargs(
+        self, request_kwargs, data, response, **kwargs
+    ):
+        url = response.headers.get("X-Next")
+        if url:
+            return {**request_kwargs, "url": url}
+
+
+StreamArrayClient = generate_wrapper_from_adapter(StreamArrayClientAdapter)
+
+
 class CustomSerializer(SimpleSerializer):
     def to_kwargs(self, data, **kwargs):
         return kwargs
@@ -71,6 +116,20 @@ class SerializerClientAdapter(SimpleClientAdapter):
 SerializerClient = generate_wrapper_from_adapter(SerializerClientAdapter)
 
 
+class EncoderSerializerClientAdapter(SimpleClientAdapter):
+    serialize_in_json_encoder = True
+
+
+EncoderSerializerClient = generate_wrapper_from_adapter(EncoderSerializerClientAdapter)
+
+
+class NormalizedKeysClientAdapter(SimpleClientAdapter):
+    normalize_response_keys = True
+
+
+NormalizedKeysClient = generate_wrapper_from_adapter(NormalizedKeysClientAdapter)
+
+
 class RetryRequestClientAdapter(SimpleClientAdapter):
     def retry_request(self, exception, *args, **kwargs):
         return kwargs["response"].status == 400
@@ -1,14 +1,28 @@
 import json
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import asdict, is_dataclass
+from decimal import Decimal
 from itertools import product
 from typing import Any, Dict, List
+from unittest.mock import patch
 
 import pytest
 import pytest_asyncio
+from aioresponses import CallbackResult
 from yarl import URL
 
-from aiotapioca import generate_wrapper_from_adapter
+from aiotapioca import (
+    InlineExecutor,
+    TapiocaAdapterForm,
+    TapiocaAdapterNDJSON,
+    generate_wrapper_from_adapter,
+)
+from aiotapioca.exceptions import ClientError
+from aiotapioca.executors import decode_for_transfer, load_transferred
+from aiotapioca.utils import estimate_size
+
+from .clients import RESOURCE_MAPPING, SimpleClientAdapter
 
 
 try:
@@ -25,8 +39,6 @@ except ImportError:
 if xmltodict:
     from aiotapioca import TapiocaAdapterXML
 
-    from .clients import RESOURCE_MAPPING
-
     class XMLClientAdapter(TapiocaAdapterXML):
         api_root = "https://api.example.org"
         resource_mapping = RESOURCE_MAPPING
@@ -34,6 +46,150 @@ if xmltodict:
     XMLClient = generate_wrapper_from_adapter(XMLClientAdapter)
 
 
+class NDJSONClientAdapter(TapiocaAdapterNDJSON):
+    api_root = "https://api.example.org"
+    resource_mapping = RESOURCE_MAPPING
+
+
+NDJSONClient = generate_wrapper_from_adapter(NDJSONClientAdapter)
+
+
+class TestTapiocaAdapterNDJSON:
+    @pytest_asyncio.fixture
+    async def ndjson_client(self):
+        async with NDJSONClient() as c:
+            yield c
+
+    async def test_pages(self, mocked, ndjson_client):
+        lines = [{"id": number} for number in range(5)]
+        mocked.get(
+            ndjson_client.test().path,
+            body="\n".join(json.dumps(line) for line in lines) + "\n",
+            status=200,
+            content_type="application/x-ndjson",
+        )
+
+        response = await ndjson_client.test().get()
+
+        request_kwargs = response.request_kwargs
+        assert request_kwargs["headers"]["Accept"] == "application/x-ndjson"
+        items = [item async for item in response().pages(raw=True)]
+        assert items == lines
+
+    async def test_error_response(self, mocked, ndjson_client):
+        mocked.get(
+            ndjson_client.test().path,
+            body='{"error": "not found"}',
+            status=404,
+            content_type="application/json",
+        )
+
+        with pytest.raises(ClientError) as exc_info:
+            await ndjson_client.test().get()
+        assert exc_info.value.data == {"error": "not found"}
+
+
+class FormClientAdapter(TapiocaAdapterForm):
+    api_root = "https://api.example.org"
+    resource_mapping = RESOURCE_MAPPING
+
+
+FormClient = generate_wrapper_from_adapter(FormClientAdapter)
+
+
+class BodyBuffer:
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, chunk):
+        self.chunks.append(bytes(chunk))
+
+    def getvalue(self):
+        return b"".join(self.chunks)
+
+
+async def read_multipart_body(form_data):
+    body = BodyBuffer()
+    await form_data().write(body)
+    return body.getvalue()
+
+
+async def generate_chunks():
+    for chunk in (b"first,", b"second,", b"third"):
+        yield chunk
+
+
+class TestTapiocaAdapterStreamBody:
+    async def test_post_async_iterable(self, mocked, client):
+        async def callback(url, data=None, **kwargs):
+            assert hasattr(data, "__aiter__")
+            body = b"".join([chunk async for chunk in data])
+            return CallbackResult(status=201, body=json.dumps(body.decode()))
+
+        mocked.post(client.test().path, callback=callback)
+        response = await client.test().post(
+            data=generate_chunks(), headers={"Content-Type": "text/csv"}
+        )
+        assert response.data() == "first,second,third"
+        assert response.request_kwargs["headers"] == {"Content-Type": "text/csv"}
+
+    async def test_post_path_is_opened_for_every_attempt(
+        self, mocked, client, tmp_path
+    ):
+        path = tmp_path / "upload.csv"
+        path.write_bytes(b"first,second")
+        bodies = []
+
+        def callback(url, data=None, **kwargs):
+            bodies.append(data.read())
+            data.close()
+            return CallbackResult(status=201, body="{}")
+
+        mocked.post(client.test().path, callback=callback)
+        mocked.post(client.test().path, callback=callback)
+        await client.test().post(data=path)
+        await client.test().post(data=path)
+        assert bodies == [b"first,second", b"first,second"]
+
+    async def test_post_file_object(self, mocked, client, tmp_path):
+        path = tmp_path / "upload.csv"
+        path.write_bytes(b"first,second")
+
+        def callback(url, data=None, **kwargs):
+            assert data is file
+            return CallbackResult(status=201, body="{}")
+
+        mocked.post(client.test().path, callback=callback)
+        with path.open("rb") as file:
+            await client.test().post(data=file)
+
+    async def test_form_multipart_upload(self, mocked, tmp_path):
+        path = tmp_path / "upload.csv"
+        path.write_bytes(b"first,second")
+        bodies = []
+
+        async def callback(url, data=None, **kwargs):
+            bodies.append(await read_multipart_body(data))
+            return CallbackResult(status=201, body="")
+
+        async with FormClient() as client:
+            mocked.post(client.test().path, callback=callback)
+            await client.test().post(
+                data={"name": "report", "file": path, "chunks": generate_chunks()}
+            )
+
+        body = bodies[0]
+        assert b'name="name"' in body and b"report" in body
+        assert b'name="file"; filename="upload.csv"' in body
+        assert b"first,second" in body
+        assert b'name="chunks"; filename="chunks"' in body
+        assert b"first,second,third" in body
+
+    async def test_form_without_stream_values_is_urlencoded(self):
+        data = {"name": "report"}
+        assert await FormClientAdapter().data_to_request(data) == data
+
+
 @pytest.mark.skipif(not xmltodict, reason="xmltodict not installed")
 class TestTapiocaAdapterXML:
     @pytest_asyncio.fixture
@@ -230,16 +386,6 @@ if pydantic:
                 "docs": "http://www.example.org",
                 "pydantic_models": None,
             },
-            "test_bad_pydantic_model": {
-                "resource": "test/",
-                "docs": "http://www.example.org",
-                "pydantic_models": 100500,
-            },
-            "test_bad_dataclass_model": {
-                "resource": "test/",
-                "docs": "http://www.example.org",
-                "pydantic_models": NotPydanticDT,
-            },
         }
 
     PydanticForcedClient = generate_wrapper_from_adapter(PydanticForcedClientAdapter)
@@ -340,27 +486,106 @@ class TestTapiocaAdapterPydantic:
             with pytest.raises(ValueError):
                 await client.test_not_found().get()
 
-    async def test_bad_pydantic_model(self, mocked):
-        async with PydanticForcedClient() as client:
-            mocked.get(
-                client.test_bad_pydantic_model().path,
-                body="{}",
-                status=200,
-                content_type="application/json",
-            )
-            with pytest.raises(ValueError):
-                await client.test_bad_pydantic_model().get()
+    @pytest.mark.parametrize(
+        "models, forced, error",
+        [
+            (100500, False, TypeError),
+            (NotPydanticDT, True, TypeError),
+            ({CustomModel: "GET", "POST": Detail}, False, TypeError),
+            ({CustomModel: 100500}, False, TypeError),
+            ({CustomModel: ["GET", None]}, False, TypeError),
+            ({CustomModel: ["GET"], Detail: "get"}, False, ValueError),
+            ({"response": {CustomModel: None, Detail: None}}, False, ValueError),
+        ],
+    )
+    def test_bad_pydantic_models_fail_on_creation(self, models, forced, error):
+        class BadModelsClientAdapter(TapiocaAdapterPydantic):
+            forced_to_have_model = forced
+            resource_mapping = {
+                "test": {"resource": "test/", "pydantic_models": models}
+            }
+
+        client_class = generate_wrapper_from_adapter(BadModelsClientAdapter)
+        with pytest.raises(error):
+            client_class()
+
+    def test_pydantic_models_index(self):
+        adapter = PydanticDefaultClientAdapter()
+        resource = PydanticDefaultClientAdapter.resource_mapping["test_root"]
+        assert adapter._pydantic_models_indexes["test_root"] == (
+            resource["pydantic_models"],
+            {("request", "POST"): Detail, ("response", "GET"): RootModel},
+        )
+        model = adapter.get_pydantic_model(
+            "request", resource, "post", resource_name="test_root"
+        )
+        assert model == Detail
 
-    async def test_bad_dataclass_model(self, mocked):
-        async with PydanticForcedClient() as client:
-            mocked.get(
-                client.test_bad_dataclass_model().path,
-                body="{}",
-                status=200,
-                content_type="application/json",
-            )
-            with pytest.raises(TypeError):
-                await client.test_bad_dataclass_model().get()
+        resource = {"resource": "test/", "pydantic_models": {CustomModel: ["get"]}}
+        model = adapter.get_pydantic_model(
+            "response", resource, "GET", resource_name="test_root"
+        )
+        assert model == CustomModel
+        assert adapter._pydantic_models_indexes["test_root"][1] == {
+            ("request", "GET"): CustomModel,
+            ("response", "GET"): CustomModel,
+        }
+
+    async def test_pydantic_generic_model(self, mocked):
+        class GenericClientAdapter(TapiocaAdapterPydantic):
+            api_root = "https://api.example.org"
+            resource_mapping = {
+                "test": {"resource": "test/", "pydantic_models": {List[Detail]: None}}
+            }
+
+        client_class = generate_wrapper_from_adapter(GenericClientAdapter)
+        async with client_class() as client:
+            mocked.get(client.test().path, body='[{"key1": "a", "key2": 1}]')
+            response = await client.test().get()
+        assert response.data() == [Detail(key1="a", key2=1)]
+
+    def test_dynamic_resource_mapping_is_compiled_once(self):
+        class DynamicClientAdapter(TapiocaAdapterPydantic):
+            def get_resource_mapping(self, api_params, **kwargs):
+                return {
+                    "test": {"resource": "test/", "pydantic_models": {Detail: "GET"}}
+                }
+
+        adapter = DynamicClientAdapter()
+        with patch.object(
+            adapter, "compile_pydantic_models", wraps=adapter.compile_pydantic_models
+        ) as compile_pydantic_models:
+            for _ in range(3):
+                resource = adapter.get_resource_mapping({})["test"]
+                model = adapter.get_pydantic_model(
+                    "response", resource, "GET", resource_name="test"
+                )
+                assert model == Detail
+        compile_pydantic_models.assert_called_once()
+
+    async def test_pydantic_type_adapters_are_cached(self, mocked):
+        @dataclass
+        class Row:
+            key1: str
+            key2: int
+
+        class CachedClientAdapter(TapiocaAdapterPydantic):
+            api_root = "https://api.example.org"
+            resource_mapping = {
+                "test": {"resource": "test/", "pydantic_models": {Row: None}}
+            }
+
+        client_class = generate_wrapper_from_adapter(CachedClientAdapter)
+        body = '{"key1": "value1", "key2": 123}'
+
+        with patch("pydantic.TypeAdapter", wraps=pydantic.TypeAdapter) as adapter:
+            for _ in range(2):
+                async with client_class() as client:
+                    for _ in range(2):
+                        mocked.get(client.test().path, body=body, status=200)
+                        response = await client.test().get()
+                        assert response.data() == Row(key1="value1", key2=123)
+        adapter.assert_called_once_with(Row)
 
     async def test_pydantic_mixin_response_to_native(self, mocked):
         response_body_root = [
@@ -547,3 +772,120 @@ class TestTapiocaAdapterPydantic:
             assert len(responses) == len(response_body_root)
             for response in responses:
                 assert response.data() == {"id": 100500}
+
+
+class CountingThreadPoolExecutor(ThreadPoolExecutor):
+    submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+class CountingProcessPoolExecutor(ProcessPoolExecutor):
+    submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+class TestTapiocaAdapterExecutor:
+    async def test_small_payloads_are_processed_inline(self, mocked):
+        counting_executor = CountingThreadPoolExecutor(max_workers=1)
+
+        class ExecutorClientAdapter(SimpleClientAdapter):
+            executor = counting_executor
+
+        client_class = generate_wrapper_from_adapter(ExecutorClientAdapter)
+
+        async with client_class() as client:
+            mocked.post(
+                client.test().path,
+                body='{"data": "small"}',
+                status=200,
+                content_type="application/json",
+            )
+            response = await client.test().post(data={"data": "small"})
+            assert response.data() == {"data": "small"}
+            assert counting_executor.submitted == 0
+
+            large = ["x" * 64] * 64
+            mocked.post(
+                client.test().path,
+                body=json.dumps(large),
+                status=200,
+                content_type="application/json",
+            )
+            response = await client.test().post(data=large)
+            assert response.data() == large
+            assert counting_executor.submitted == 2
+
+        counting_executor.shutdown()
+
+    async def test_inline_executor(self, mocked):
+        class InlineClientAdapter(SimpleClientAdapter):
+            executor = InlineExecutor()
+
+        client_class = generate_wrapper_from_adapter(InlineClientAdapter)
+        large = ["x" * 64] * 64
+
+        async with client_class() as client:
+            mocked.get(
+                client.test().path,
+                body=json.dumps(large),
+                status=200,
+                content_type="application/json",
+            )
+            with patch("asyncio.BaseEventLoop.run_in_executor") as run_in_executor:
+                response = await client.test().get()
+            assert response.data() == large
+            run_in_executor.assert_not_called()
+
+    def test_estimate_size(self):
+        assert estimate_size("x" * 10, 1024) == 12
+        assert estimate_size({"key": [1, 2.0, None]}, 1024) == 33
+        assert estimate_size(["x" * 64] * 1000, 100) < 200
+        assert estimate_size([{"key": 1}] * 1000000, 100) < 200
+        assert estimate_size({"key": Decimal("1.0")}, 1024) == 15
+        assert estimate_size({"key": object()}, 1024) == 1024
+
+    async def test_large_bodies_are_decoded_in_process_executor(self, mocked):
+        counting_executor = CountingProcessPoolExecutor(max_workers=1)
+
+        class ProcessClientAdapter(SimpleClientAdapter):
+            process_executor = counting_executor
+            process_size_threshold = 1024
+            normalize_response_keys = True
+
+        client_class = generate_wrapper_from_adapter(ProcessClientAdapter)
+        large = [{"someKey": "x" * 64}] * 64
+
+        async with client_class() as client:
+            for body in ('{"someKey": "small"}', json.dumps(large)):
+                mocked.get(
+                    client.test().path,
+                    body=body,
+                    status=200,
+                    content_type="application/json",
+                )
+            response = await client.test().get()
+            assert response.data() == {"some_key": "small"}
+            assert counting_executor.submitted == 0
+
+            response = await client.test().get()
+            assert response.data() == [{"some_key": "x" * 64}] * 64
+            assert counting_executor.submitted == 1
+
+        counting_executor.shutdown()
+
+    def test_transferred_data_is_unpacked_at_the_packed_depth(self):
+        data = {"items": list(range(10)), "nested": {"items": list(range(10))}}
+
+        transferred = decode_for_transfer(lambda data: data, data, chunk_size=3)
+        unpacked = load_transferred(transferred)
+        assert unpacked == data
+        assert unpacked["nested"] is transferred["nested"]
+
+        transferred = decode_for_transfer(lambda data: data, {"items": [1, 2]})
+        assert load_transferred(transferred) is transferred
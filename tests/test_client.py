@@ -1,13 +1,28 @@
+import asyncio
 import json
 import pickle
+import re
 from itertools import product
 
 import pytest
 import pytest_asyncio
 from aiohttp import ClientSession
+from aioresponses import CallbackResult
 
-from aiotapioca.client import ProcessData, TapiocaClientExecutor, TapiocaClientResponse
+from aiotapioca import (
+    ExponentialRetryPolicy,
+    FixedRetryPolicy,
+    generate_wrapper_from_adapter,
+)
+from aiotapioca.client import (
+    BatchResult,
+    ProcessData,
+    TapiocaClientExecutor,
+    TapiocaClientResponse,
+)
 from aiotapioca.exceptions import ClientError, ServerError
+from aiotapioca.streams import JSONArrayStream, ResponseStream
+from aiotapioca.utils import URLTemplate, compile_url_template
 
 from .callbacks import callback_201, callback_401
 from .clients import (
@@ -16,10 +31,16 @@ from .clients import (
     DictParserClient,
     FailTokenRefreshClient,
     FuncParserClient,
+    NormalizedKeysClient,
+    OffsetPagingClient,
     RetryRequestClient,
+    RetryRequestClientAdapter,
     SimpleClient,
+    SimpleClientAdapter,
     StaticMethodParserClient,
+    StreamArrayClient,
     TokenRefreshByDefaultClient,
+    TokenRefreshByDefaultClientAdapter,
     TokenRefreshClient,
 )
 
@@ -32,7 +53,7 @@ def check_response(current_data, expected_data, response, status=200):
 
 
 async def check_pages_responses(
-    response, total_pages=1, max_pages=None, max_items=None
+    response, total_pages=1, max_pages=None, max_items=None, prefetch=0
 ):
     result_response = {
         response.data: {
@@ -47,7 +68,9 @@ async def check_pages_responses(
         check_response(current_data, expected_data, response)
 
     iterations_count = 0
-    async for page in response().pages(max_pages=max_pages, max_items=max_items):
+    async for page in response().pages(
+        max_pages=max_pages, max_items=max_items, prefetch=prefetch
+    ):
         result_page = {page.data: {"key": "value"}, page.data.key: "value"}
         for current_data, expected_data in result_page.items():
             check_response(current_data, expected_data, page)
@@ -60,7 +83,15 @@ class TestTapiocaClient:
         dir_var = dir(client)
         resources = client._api.get_resource_mapping(client._api_params)
         expected_methods = sorted(
-            [*resources, "api_params", "close", "closed", "initialize", "session"]
+            [
+                *resources,
+                "api_params",
+                "close",
+                "closed",
+                "initialize",
+                "limiter",
+                "session",
+            ]
         )
         assert len(dir_var) == len(expected_methods)
         for attr, expected in zip(dir_var, expected_methods):
@@ -123,6 +154,148 @@ class TestTapiocaClient:
                 iterations_count += 1
             assert iterations_count == 2
 
+    async def test_resources_are_cached(self):
+        client = SimpleClient()
+        resource = client.user
+
+        assert client.user is resource
+        assert client.test is not resource
+        assert client.test is client.test
+
+        client.api_params["default_url_params"] = {"id": 1}
+        assert client.user is not resource
+        assert client.user().path == "https://api.example.org/user/1/"
+
+        resource = client.user
+        await client.initialize()
+        assert client.user is not resource
+        assert client.user.session is client.session
+        await client.close()
+
+    def test_resource_mapping_is_resolved_once(self):
+        calls = []
+
+        class CountingAdapter(SimpleClientAdapter):
+            def get_resource_mapping(self, api_params, **kwargs):
+                calls.append(1)
+                return super().get_resource_mapping(api_params, **kwargs)
+
+        client = generate_wrapper_from_adapter(CountingAdapter)()
+        for _ in range(10):
+            client.user(id=1)
+        assert len(calls) == 1
+
+        with pytest.raises(AttributeError):
+            client.not_a_resource
+        with pytest.raises(AttributeError):
+            client.not_a_resource
+
+    async def test_limiter_is_shared_between_requests(self, mocked):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def callback(url, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return CallbackResult(status=200, body='{"data": "value"}')
+
+        async with SimpleClient(semaphore=2) as client:
+            for number in range(10):
+                mocked.get(
+                    client.user(id=number).path,
+                    callback=callback,
+                    content_type="application/json",
+                )
+
+            responses = await asyncio.gather(
+                *[client.user(id=number).get() for number in range(10)]
+            )
+
+            assert len(responses) == 10
+            assert max_in_flight == 2
+            assert client.limiter.limit == 2
+            assert client.limiter.acquired == 10
+            assert client.limiter.in_flight == 0
+            assert client.limiter.waiting == 0
+            assert client.limiter.max_wait > 0
+
+    async def test_limiter_per_host(self, mocked):
+        in_flight = {}
+        max_in_flight = {}
+
+        async def callback(url, **kwargs):
+            in_flight[url.host] = in_flight.get(url.host, 0) + 1
+            max_in_flight[url.host] = max(
+                max_in_flight.get(url.host, 0), in_flight[url.host]
+            )
+            await asyncio.sleep(0.01)
+            in_flight[url.host] -= 1
+            return CallbackResult(status=200, body='{"data": "value"}')
+
+        async with SimpleClient(semaphore=4, semaphore_per_host=1) as client:
+            for resource in ("test", "another_root"):
+                for _ in range(3):
+                    mocked.get(
+                        getattr(client, resource)().path,
+                        callback=callback,
+                        content_type="application/json",
+                    )
+
+            await asyncio.gather(
+                *[
+                    getattr(client, resource)().get()
+                    for resource in ("test", "another_root")
+                    for _ in range(3)
+                ]
+            )
+
+            assert max_in_flight == {"api.example.org": 1, "api.another.com": 1}
+
+    async def test_limiter_is_released_while_waiting_to_retry(self, mocked):
+        completed = []
+        policy = FixedRetryPolicy(delay=0.05)
+        async with RetryRequestClient(semaphore=1, retry_policy=policy) as client:
+            mocked.get(client.test().path, body="{}", status=400)
+            mocked.get(client.test().path, body='{"data": "retried"}', status=200)
+            mocked.get(client.user(id=1).path, body='{"data": "user"}', status=200)
+
+            async def get(executor):
+                response = await executor.get()
+                completed.append(response.data.data())
+
+            await asyncio.gather(get(client.test()), get(client.user(id=1)))
+            assert client.limiter.acquired == 3
+
+        assert completed == ["user", "retried"]
+
+    async def test_limiter_is_released_while_refreshing_authentication(self, mocked):
+        class RefreshThroughClientAdapter(TokenRefreshByDefaultClientAdapter):
+            async def refresh_authentication(self, exception, *args, **kwargs):
+                response = await kwargs["client"].user(id="token").get()
+                return response.data.token()
+
+        client_class = generate_wrapper_from_adapter(RefreshThroughClientAdapter)
+        async with client_class(semaphore=1) as client:
+            mocked.get(client.test().path, callback=callback_401)
+            mocked.get(
+                client.user(id="token").path, body='{"token": "new"}', status=200
+            )
+            mocked.get(client.test().path, body='{"data": "value"}', status=200)
+
+            response = await asyncio.wait_for(client.test().get(), 1)
+
+        assert response.data.data() == "value"
+
+    def test_limiter_is_pickleable(self):
+        client = SimpleClient(semaphore=3)
+        client.limiter._get_semaphores("https://api.example.org/")
+        pickle_client = pickle.loads(pickle.dumps(client))
+        assert pickle_client.limiter.limit == 3
+        assert pickle_client.limiter._semaphore is None
+
 
 class TestTapiocaClientResource:
     def test_available_attributes(self, client):
@@ -130,6 +303,8 @@ class TestTapiocaClientResource:
         expected_methods = sorted(
             [
                 "api_params",
+                "get_batch",
+                "get_batch_iter",
                 "open_docs",
                 "path",
                 "resource",
@@ -151,6 +326,37 @@ class TestTapiocaClientResource:
         client = SimpleClient(default_url_params={"id": 123})
         assert client.user().path == "https://api.example.org/user/123/"
 
+    def test_fill_url_template_quotes_params(self, client):
+        executor = client.user(id="a b/c?d")
+        assert executor.path == "https://api.example.org/user/a%20b%2Fc%3Fd/"
+
+    def test_fill_url_template_without_quoting(self):
+        class NoQuoteAdapter(SimpleClientAdapter):
+            quote_url_params = False
+
+        client = generate_wrapper_from_adapter(NoQuoteAdapter)()
+        assert client.user(id="a/b").path == "https://api.example.org/user/a/b/"
+
+    def test_fill_url_template_with_missing_params(self, client):
+        with pytest.raises(KeyError, match="number"):
+            client.resource(foo="bar")
+
+    def test_url_template(self):
+        template = URLTemplate("https://api.example.org/{a}/{{b}}/{a}/{c}/")
+        assert template.names == ("a", "c")
+        assert (
+            template.fill({"a": 1, "c": "x y", "d": 2})
+            == "https://api.example.org/1/{b}/1/x%20y/"
+        )
+        assert compile_url_template(template.template) is compile_url_template(
+            template.template
+        )
+
+        template = URLTemplate("https://api.example.org/{a.real}/{b!r}/{c:03}/")
+        assert template.fill({"a": 1, "b": "x", "c": 7}) == (
+            "https://api.example.org/1/'x'/007/"
+        )
+
     def test_fill_another_root_url_template(self, client):
         expected_url = "https://api.another.com/another-root/"
         resource = client.another_root()
@@ -162,6 +368,51 @@ class TestTapiocaClientResource:
         assert "foo" in client.resource
         assert "spam" in client.resource
 
+    async def test_get_batch(self, mocked, client):
+        for number in range(5):
+            mocked.get(
+                client.user(id=number).path + "?fields=name",
+                body=json.dumps({"id": number}),
+                status=200,
+                content_type="application/json",
+            )
+
+        url_params = [{"id": number} for number in range(5)]
+        results = await client.user.get_batch(url_params, params={"fields": "name"})
+
+        assert [response.data.id() for response in results] == list(range(5))
+        assert client.limiter.acquired == 5
+
+    async def test_get_batch_iter(self, mocked, client):
+        for number in range(5):
+            mocked.get(
+                client.user(id=number).path,
+                body=json.dumps({"id": number}),
+                status=404 if number == 2 else 200,
+                content_type="application/json",
+            )
+
+        async def url_params():
+            for number in range(5):
+                yield {"id": number}
+
+        results = {}
+        async for index, item in client.user.get_batch_iter(
+            url_params(), return_exceptions=True
+        ):
+            results[index] = item
+
+        assert sorted(results) == list(range(5))
+        assert isinstance(results.pop(2), ClientError)
+        for index, response in results.items():
+            assert response.data.id() == index
+
+    def test_default_url_params_are_not_changed(self):
+        client = SimpleClient(default_url_params={"id": 123})
+        assert client.user(id=1).path == "https://api.example.org/user/1/"
+        assert client.user().path == "https://api.example.org/user/123/"
+        assert client.api_params["default_url_params"] == {"id": 123}
+
     def test_docs(self, client):
         expected = (
             f"Resource: {client.resource.resource['resource']}\n"
@@ -187,7 +438,13 @@ class TestTapiocaClientExecutor:
                 "put_batch",
                 "patch_batch",
                 "delete_batch",
+                "post_batch_iter",
+                "put_batch_iter",
+                "patch_batch_iter",
+                "delete_batch_iter",
                 "pages",
+                "pages_parallel",
+                "iter_pages",
                 "api_params",
                 "path",
                 "resource",
@@ -338,6 +595,124 @@ class TestTapiocaClientExecutor:
             with pytest.raises(ClientError):
                 await client.test().get()
 
+    async def test_retry_request_records_attempts(self, mocked):
+        error_data = {"error": "bad request test"}
+        success_data = {"data": "success!"}
+        async with RetryRequestClient() as client:
+            for _ in range(3):
+                mocked.get(
+                    client.test().path,
+                    body=json.dumps(error_data),
+                    status=400,
+                    content_type="application/json",
+                )
+            mocked.get(
+                client.test().path,
+                body=json.dumps(success_data),
+                status=200,
+                content_type="application/json",
+            )
+
+            response = await client.test().get()
+
+            assert [attempt.number for attempt in response.attempts] == [0, 1, 2, 3]
+            assert [attempt.status for attempt in response.attempts] == [
+                400,
+                400,
+                400,
+                200,
+            ]
+            assert all(attempt.delay == 0 for attempt in response.attempts)
+            assert all(attempt.elapsed >= 0 for attempt in response.attempts)
+            assert isinstance(response.attempts[0].error, ClientError)
+            assert response.attempts[0].error.__traceback__ is None
+            assert response.attempts[-1].error is None
+
+    async def test_retry_request_uses_retry_policy(self, mocked, monkeypatch):
+        delays = []
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+
+        monkeypatch.setattr("aiotapioca.client.client.sleep", fake_sleep)
+
+        error_data = {"error": "bad request test"}
+        policy = ExponentialRetryPolicy(base=1, factor=2, max_delay=3)
+        async with RetryRequestClient(retry_policy=policy) as client:
+            for _ in range(4):
+                mocked.get(
+                    client.test().path,
+                    body=json.dumps(error_data),
+                    status=400,
+                    content_type="application/json",
+                )
+            mocked.get(
+                client.test().path,
+                body='{"data": "success!"}',
+                status=200,
+                content_type="application/json",
+            )
+
+            response = await client.test().get()
+
+        assert delays == [1, 2, 3, 3]
+        assert [attempt.delay for attempt in response.attempts] == [1, 2, 3, 3, 0]
+
+    async def test_retry_request_does_not_recurse(self, mocked):
+        class ManyRetriesAdapter(RetryRequestClientAdapter):
+            max_retries_requests = 1500
+
+        async with generate_wrapper_from_adapter(ManyRetriesAdapter)() as client:
+            for _ in range(1500):
+                mocked.get(
+                    client.test().path,
+                    body='{"error": "bad request test"}',
+                    status=400,
+                    content_type="application/json",
+                )
+            mocked.get(
+                client.test().path,
+                body='{"data": "success!"}',
+                status=200,
+                content_type="application/json",
+            )
+
+            response = await client.test().get()
+
+            assert response.data.data() == "success!"
+            assert len(response.attempts) == 1501
+
+    async def test_failed_request_keeps_attempts(self, mocked):
+        class FewRetriesAdapter(RetryRequestClientAdapter):
+            max_retries_requests = 2
+
+        async with generate_wrapper_from_adapter(FewRetriesAdapter)() as client:
+            for _ in range(3):
+                mocked.get(
+                    client.test().path,
+                    body='{"error": "bad request test"}',
+                    status=400,
+                    content_type="application/json",
+                )
+
+            with pytest.raises(ClientError) as exc_info:
+                await client.test().get()
+
+        attempts = exc_info.value.attempts
+        assert [attempt.number for attempt in attempts] == [0, 1, 2]
+        assert [attempt.status for attempt in attempts] == [400, 400, 400]
+        assert attempts[-1].error is exc_info.value
+        assert attempts[0].error.__traceback__ is None
+        assert attempts[-1].error.__traceback__ is not None
+
+        async with SimpleClient() as client:
+            mocked.get(client.test().path, exception=ConnectionError("refused"))
+            with pytest.raises(ConnectionError) as exc_info:
+                await client.test().get()
+
+        assert len(exc_info.value.attempts) == 1
+        assert exc_info.value.attempts[0].status is None
+
     async def test_requests(self, mocked, client):
         semaphores = (3, None)
         types_request = ("get", "post", "put", "patch", "delete")
@@ -409,6 +784,172 @@ class TestTapiocaClientExecutor:
 
             assert len(results) == len(response_data)
 
+    async def test_batch_requests_with_window(self, mocked, client):
+        in_flight = 0
+        max_in_flight = 0
+        pulled = 0
+
+        async def callback(url, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return CallbackResult(status=201, body=kwargs["data"])
+
+        def rows():
+            nonlocal pulled
+            for number in range(20):
+                pulled += 1
+                # rows are pulled lazily, never more than the window ahead
+                assert pulled - client.limiter.acquired <= 3
+                yield {"number": number}
+
+        mocked.post(
+            client.test().path,
+            callback=callback,
+            content_type="application/json",
+            repeat=True,
+        )
+
+        results = await client.test().post_batch(data=rows(), window=3)
+
+        assert max_in_flight == 3
+        assert [response.data.number() for response in results] == list(range(20))
+
+    async def test_batch_requests_with_async_iterable(self, mocked, client):
+        async def rows():
+            for number in range(5):
+                yield {"number": number}
+
+        for number in range(5):
+            mocked.post(
+                client.test().path,
+                body=json.dumps({"number": number}),
+                status=201,
+                content_type="application/json",
+            )
+
+        results = await client.test().post_batch(data=rows(), semaphore=2)
+
+        assert len(results) == 5
+        for response in results:
+            assert response.status == 201
+
+    async def test_batch_iter_requests(self, mocked, client):
+        async def callback(url, **kwargs):
+            number = json.loads(kwargs["data"])["number"]
+            # the first rows are the slowest ones, each one completes only after
+            # the response of the next row was received
+            while reverse_order and number < 4 and number + 1 not in indexes:
+                await asyncio.sleep(0.001)
+            return CallbackResult(status=201, body=kwargs["data"])
+
+        types_request = ("post", "put", "patch", "delete")
+        for type_request in types_request:
+            executor = client.test()
+            getattr(mocked, type_request)(
+                executor.path,
+                callback=callback,
+                content_type="application/json",
+                repeat=True,
+            )
+            executor_method = getattr(executor, type_request + "_batch_iter")
+            data = [{"number": number} for number in range(5)]
+
+            indexes = []
+            reverse_order = True
+            async for index, response in executor_method(data=data, window=5):
+                assert response.data.number() == index
+                indexes.append(index)
+
+            assert indexes == [4, 3, 2, 1, 0]
+
+            indexes = []
+            reverse_order = False
+            async for index, response in executor_method(
+                data=data, window=5, ordered=True, reorder_buffer=2
+            ):
+                assert response.data.number() == index
+                indexes.append(index)
+
+            assert indexes == list(range(5))
+
+    async def test_batch_requests_collect_errors(self, mocked, client):
+        async def callback(url, **kwargs):
+            number = json.loads(kwargs["data"])["number"]
+            status = 400 if number in (1, 3) else 201
+            return CallbackResult(status=status, body=kwargs["data"])
+
+        mocked.post(
+            client.test().path,
+            callback=callback,
+            content_type="application/json",
+            repeat=True,
+        )
+        data = [{"number": number} for number in range(5)]
+
+        result = await client.test().post_batch(data=data, return_exceptions=True)
+
+        assert type(result) is BatchResult
+        assert not result.ok
+        assert len(result) == 5
+        assert sorted(result.responses) == [0, 2, 4]
+        assert sorted(result.errors) == [1, 3]
+        assert all(isinstance(error, ClientError) for error in result.errors.values())
+        assert result.cancelled == []
+        assert result.failed_data == [{"number": 1}, {"number": 3}]
+        assert [type(item) for item in result] == [
+            TapiocaClientResponse,
+            ClientError,
+            TapiocaClientResponse,
+            ClientError,
+            TapiocaClientResponse,
+        ]
+
+        indexes = []
+        async for index, item in client.test().post_batch_iter(
+            data=data, return_exceptions=True
+        ):
+            indexes.append(index)
+            assert isinstance(item, ClientError) == (index in (1, 3))
+        assert sorted(indexes) == list(range(5))
+
+    async def test_batch_requests_fail_fast(self, mocked, client):
+        finished = []
+
+        async def callback(url, **kwargs):
+            number = json.loads(kwargs["data"])["number"]
+            if number == 0:
+                return CallbackResult(status=400, body=kwargs["data"])
+            await asyncio.sleep(0.05)
+            finished.append(number)
+            return CallbackResult(status=201, body=kwargs["data"])
+
+        mocked.post(
+            client.test().path,
+            callback=callback,
+            content_type="application/json",
+            repeat=True,
+        )
+        data = [{"number": number} for number in range(10)]
+
+        result = await client.test().post_batch(
+            data=data, window=3, return_exceptions=True, fail_fast=True
+        )
+
+        assert finished == []
+        assert result.responses == {}
+        assert isinstance(result.errors[0], ClientError)
+        assert result.cancelled == list(range(1, 10))
+        assert len(result) == 10
+        assert result.failed_data == data
+
+        with pytest.raises(ClientError):
+            await client.test().post_batch(data=data, window=3)
+        assert finished == []
+        assert client.limiter.in_flight == 0
+
     async def test_pass_api_params_in_requests(self, mocked):
         semaphores = (4, None, False)
         types_request = ("get", "post", "put", "patch", "delete")
@@ -855,6 +1396,503 @@ class TestTapiocaClientExecutorIteratorFeatures:
         assert iterations_count == 4
 
 
+class TestTapiocaClientExecutorRawPages:
+    @pytest_asyncio.fixture
+    async def response(self, mocked, client):
+        next_url = "http://api.example.org/next_batch"
+        data = {"data": [{"key": 1}, {"key": 2}], "paging": {"next": next_url}}
+        mocked.get(
+            client.test().path,
+            body=json.dumps(data),
+            status=200,
+            content_type="application/json",
+        )
+        data = {"data": [{"key": 3}, {"key": 4}], "paging": {"next": ""}}
+        mocked.get(
+            next_url,
+            body=json.dumps(data),
+            status=200,
+            content_type="application/json",
+            repeat=True,
+        )
+        yield await client.test().get()
+
+    async def test_raw_pages(self, response):
+        items = [item async for item in response().pages(raw=True)]
+        assert items == [{"key": 1}, {"key": 2}, {"key": 3}, {"key": 4}]
+
+        items = [item async for item in response().pages(raw=True, max_items=3)]
+        assert items == [{"key": 1}, {"key": 2}, {"key": 3}]
+
+        items = [item async for item in response().pages(raw=True, prefetch=1)]
+        assert items == [{"key": 1}, {"key": 2}, {"key": 3}, {"key": 4}]
+
+        items = [item async for item in response().pages_parallel(raw=True)]
+        assert items == [{"key": 1}, {"key": 2}, {"key": 3}, {"key": 4}]
+
+    async def test_iter_pages(self, response):
+        pages = [page async for page in response().iter_pages()]
+        assert pages == [[{"key": 1}, {"key": 2}], [{"key": 3}, {"key": 4}]]
+
+        pages = [page async for page in response().iter_pages(max_pages=1)]
+        assert pages == [[{"key": 1}, {"key": 2}]]
+
+        pages = [page async for page in response().iter_pages(max_items=3)]
+        assert pages == [[{"key": 1}, {"key": 2}], [{"key": 3}]]
+
+        pages = [page async for page in response().iter_pages(max_items=2)]
+        assert pages == [[{"key": 1}, {"key": 2}]]
+
+        pages = [page async for page in response().iter_pages(max_pages=0)]
+        assert pages == []
+
+        pages = [page async for page in response().iter_pages(prefetch=2)]
+        assert pages == [[{"key": 1}, {"key": 2}], [{"key": 3}, {"key": 4}]]
+
+
+class TestTapiocaClientExecutorResumablePages:
+    @pytest_asyncio.fixture
+    async def paged_client(self, mocked, client):
+        async def callback(url, **kwargs):
+            page = int(url.query.get("page", 1))
+            next_page = f"{client.test().path}?page={page + 1}"
+            data = {
+                "data": [{"page": page, "item": 0}, {"page": page, "item": 1}],
+                "paging": {"next": next_page if page < 4 else ""},
+            }
+            return CallbackResult(status=200, body=json.dumps(data))
+
+        mocked.get(
+            re.compile(re.escape(client.test().path) + ".*"),
+            callback=callback,
+            content_type="application/json",
+            repeat=True,
+        )
+        yield client
+
+    async def test_pages_checkpoints(self, paged_client):
+        checkpoints = []
+        response = await paged_client.test().get()
+
+        items = [
+            (item.data.page(), item.data.item())
+            async for item in response().pages(on_checkpoint=checkpoints.append)
+        ]
+
+        assert len(items) == 8
+        assert [checkpoint["page_count"] for checkpoint in checkpoints] == [1, 2, 3, 4]
+        assert [checkpoint["item_count"] for checkpoint in checkpoints] == [2, 4, 6, 8]
+        assert checkpoints[0]["request_kwargs"]["url"].endswith("?page=2")
+        assert checkpoints[-1]["request_kwargs"] is None
+
+    async def test_pages_resume_from_checkpoint(self, paged_client):
+        checkpoints = []
+
+        async def save_checkpoint(checkpoint):
+            checkpoints.append(json.dumps(checkpoint))
+
+        response = await paged_client.test().get()
+        async for item in response().pages(on_checkpoint=save_checkpoint):
+            if item.data.page() == 2 and item.data.item() == 1:
+                break
+
+        # the second page was interrupted before its checkpoint was saved
+        assert len(checkpoints) == 1
+        checkpoint = json.loads(checkpoints[-1])
+
+        for prefetch in (0, 2):
+            items = [
+                (item.data.page(), item.data.item())
+                async for item in paged_client.test().pages(
+                    checkpoint=checkpoint, prefetch=prefetch
+                )
+            ]
+            assert items == [(page, item) for page in (2, 3, 4) for item in (0, 1)]
+
+        items = [
+            item["page"]
+            async for item in paged_client.test().pages(
+                checkpoint=checkpoint, max_items=5, raw=True
+            )
+        ]
+        assert items == [2, 2, 3]
+
+        pages = [
+            [item["page"] for item in page]
+            async for page in paged_client.test().iter_pages(
+                checkpoint=checkpoint, max_pages=3
+            )
+        ]
+        assert pages == [[2, 2], [3, 3]]
+
+    async def test_iter_pages_checkpoints(self, paged_client):
+        checkpoints = []
+        response = await paged_client.test().get()
+
+        async for _ in response().iter_pages(
+            max_items=5, on_checkpoint=checkpoints.append
+        ):
+            pass
+
+        assert [checkpoint["item_count"] for checkpoint in checkpoints] == [2, 4]
+
+        checkpoints = []
+        async for _ in response().iter_pages(on_checkpoint=checkpoints.append):
+            pass
+
+        assert [checkpoint["item_count"] for checkpoint in checkpoints] == [2, 4, 6, 8]
+
+        pages = [
+            page
+            async for page in paged_client.test().iter_pages(
+                max_items=5, checkpoint=checkpoints[1]
+            )
+        ]
+        assert sum(len(page) for page in pages) == 1
+
+        pages = [
+            page
+            async for page in paged_client.test().iter_pages(checkpoint=checkpoints[-1])
+        ]
+        assert pages == []
+
+
+class TestTapiocaClientExecutorPrefetchPages:
+    @staticmethod
+    def mock_pages(mocked, client, total_pages, events=None, status=None):
+        async def callback(url, **kwargs):
+            page = int(url.query.get("page", 1))
+            if events is not None:
+                events.append(("request", page))
+            await asyncio.sleep(0.01)
+            next_page = f"{client.test().path}?page={page + 1}"
+            data = {
+                "data": [{"page": page, "key": "value"}, {"page": page}],
+                "paging": {"next": next_page if page < total_pages else ""},
+            }
+            return CallbackResult(
+                status=(status or {}).get(page, 200), body=json.dumps(data)
+            )
+
+        mocked.get(
+            re.compile(re.escape(client.test().path) + ".*"),
+            callback=callback,
+            content_type="application/json",
+            repeat=True,
+        )
+
+    async def test_prefetch_pages(self, mocked, client):
+        self.mock_pages(mocked, client, total_pages=5)
+        response = await client.test().get()
+
+        for prefetch in (0, 1, 3):
+            pages = [
+                page.data.page() async for page in response().pages(prefetch=prefetch)
+            ]
+            assert pages == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+
+            pages = [
+                page.data.page()
+                async for page in response().pages(max_pages=2, prefetch=prefetch)
+            ]
+            assert pages == [1, 1, 2, 2]
+
+            pages = [
+                page.data.page()
+                async for page in response().pages(max_items=3, prefetch=prefetch)
+            ]
+            assert pages == [1, 1, 2]
+
+    async def test_prefetch_pages_with_limits(self, mocked, client):
+        next_url = "http://api.example.org/next_batch"
+        data = {"data": [{"key": "value"}], "paging": {"next": next_url}}
+        mocked.get(
+            client.test().path,
+            body=json.dumps(data),
+            status=200,
+            content_type="application/json",
+        )
+        data["data"].append({"key": "value"})
+        data["paging"]["next"] = ""
+        mocked.get(
+            next_url,
+            body=json.dumps(data),
+            status=200,
+            content_type="application/json",
+        )
+
+        response = await client.test().get()
+
+        await check_pages_responses(response, total_pages=3, prefetch=2)
+
+    async def test_prefetch_pages_overlaps_with_consumer(self, mocked, client):
+        events = []
+        self.mock_pages(mocked, client, total_pages=4, events=events)
+        response = await client.test().get()
+        events.clear()
+
+        async for page in response().pages(prefetch=1):
+            events.append(("item", page.data.page()))
+            await asyncio.sleep(0.02)
+
+        # the next page is requested while the items of the current one are
+        # consumed, but never more than one page ahead
+        def position(event, last=False):
+            positions = [i for i, current in enumerate(events) if current == event]
+            return positions[-1] if last else positions[0]
+
+        for page in (1, 2, 3):
+            assert position(("request", page + 1)) < position(("item", page), True)
+            if page < 3:
+                assert position(("request", page + 2)) > position(("item", page + 1))
+
+    async def test_prefetch_pages_with_error(self, mocked, client):
+        self.mock_pages(mocked, client, total_pages=5, status={3: 500})
+        response = await client.test().get()
+
+        pages = []
+        with pytest.raises(ServerError):
+            async for page in response().pages(prefetch=2):
+                pages.append(page.data.page())
+
+        assert pages == [1, 1, 2, 2]
+
+    async def test_prefetch_pages_stops_on_break(self, mocked, client):
+        events = []
+        self.mock_pages(mocked, client, total_pages=10, events=events)
+        response = await client.test().get()
+        events.clear()
+
+        async for page in response().pages(prefetch=2):
+            break
+
+        await asyncio.sleep(0.05)
+        assert len(events) <= 2
+        assert client.limiter.in_flight == 0
+
+
+class TestTapiocaClientExecutorParallelPages:
+    @pytest_asyncio.fixture
+    async def offset_client(self):
+        async with OffsetPagingClient() as client:
+            yield client
+
+    @staticmethod
+    def mock_pages(mocked, client, total=10, limit=2, status=None):
+        async def callback(url, **kwargs):
+            offset = int(url.query.get("offset", 0))
+            # the first pages are the slowest ones
+            await asyncio.sleep(0.01 * (total - offset))
+            data = {
+                "data": [
+                    {"number": number} for number in range(offset, offset + limit)
+                ],
+                "offset": offset,
+                "limit": limit,
+                "total": total,
+            }
+            return CallbackResult(
+                status=(status or {}).get(offset, 200), body=json.dumps(data)
+            )
+
+        mocked.get(
+            re.compile(re.escape(client.test().path) + ".*"),
+            callback=callback,
+            content_type="application/json",
+            repeat=True,
+        )
+
+    async def test_parallel_pages(self, mocked, offset_client):
+        self.mock_pages(mocked, offset_client)
+        response = await offset_client.test().get()
+
+        items = [item.data.number() async for item in response().pages_parallel()]
+        assert items == list(range(10))
+
+        items = [
+            item.data.number()
+            async for item in response().pages_parallel(ordered=False, window=4)
+        ]
+        assert sorted(items) == list(range(10))
+        assert items != list(range(10))
+
+        items = [
+            item.data.number()
+            async for item in response().pages_parallel(max_pages=3, max_items=5)
+        ]
+        assert items == list(range(5))
+
+        items = [
+            item.data.number() async for item in response().pages_parallel(max_pages=2)
+        ]
+        assert items == list(range(4))
+
+    async def test_parallel_pages_bounds_reordered_pages(self, mocked, offset_client):
+        self.mock_pages(mocked, offset_client, total=20)
+        response = await offset_client.test().get()
+        requested = []
+        send = offset_client._api.prepare_request_kwargs
+
+        async def prepare_request_kwargs(*args, **kwargs):
+            requested.append(kwargs["request_kwargs"]["params"]["offset"])
+            return await send(*args, **kwargs)
+
+        offset_client._api.prepare_request_kwargs = prepare_request_kwargs
+        items = []
+        async for item in response().pages_parallel(window=3):
+            if item.data.number() == 2:
+                # the first parallel page is the slowest one
+                assert len(requested) <= 3
+            items.append(item.data.number())
+
+        assert items == list(range(20))
+
+    async def test_parallel_pages_fallback_to_sequential(self, mocked, client):
+        next_url = "http://api.example.org/next_batch"
+        data = {"data": [{"key": "value"}], "paging": {"next": next_url}}
+        mocked.get(
+            client.test().path,
+            body=json.dumps(data),
+            status=200,
+            content_type="application/json",
+        )
+        data["paging"]["next"] = ""
+        mocked.get(
+            next_url,
+            body=json.dumps(data),
+            status=200,
+            content_type="application/json",
+        )
+
+        response = await client.test().get()
+
+        items = [item.data.key() async for item in response().pages_parallel()]
+        assert items == ["value", "value"]
+
+    async def test_parallel_pages_with_error(self, mocked, offset_client):
+        self.mock_pages(mocked, offset_client, total=8, status={4: 500})
+        response = await offset_client.test().get()
+
+        items = []
+        with pytest.raises(ServerError):
+            async for item in response().pages_parallel():
+                items.append(item.data.number())
+
+        assert items == [0, 1, 2, 3]
+        assert offset_client.limiter.in_flight == 0
+
+
+class TestTapiocaClientExecutorStreamArray:
+    @pytest_asyncio.fixture
+    async def stream_client(self):
+        async with StreamArrayClient() as c:
+            yield c
+
+    @pytest_asyncio.fixture
+    async def response(self, mocked, stream_client):
+        next_url = "http://api.example.org/next_batch"
+        mocked.get(
+            stream_client.stream().path,
+            body=json.dumps([{"someKey": 1}, {"someKey": 2}]),
+            status=200,
+            content_type="application/json",
+            headers={"X-Next": next_url},
+        )
+        mocked.get(
+            next_url,
+            body=json.dumps([{"someKey": 3}]),
+            status=200,
+            content_type="application/json",
+        )
+        yield await stream_client.stream().get()
+
+    async def test_response_data_is_streamed(self, response):
+        stream = response.data()
+        assert isinstance(stream, JSONArrayStream)
+        assert [item async for item in stream] == [{"some_key": 1}, {"some_key": 2}]
+        assert stream.count == 2
+        with pytest.raises(RuntimeError):
+            [item async for item in stream]
+
+    async def test_pages(self, response):
+        items = [item async for item in response().pages(raw=True)]
+        assert items == [{"some_key": 1}, {"some_key": 2}, {"some_key": 3}]
+
+    async def test_pages_stop_in_the_middle_of_a_stream(self, response):
+        items = [item async for item in response().pages(raw=True, max_items=1)]
+        assert items == [{"some_key": 1}]
+        assert response.response.closed
+
+    async def test_iter_pages(self, response):
+        pages = [page async for page in response().iter_pages()]
+        assert pages == [[{"some_key": 1}, {"some_key": 2}], [{"some_key": 3}]]
+
+    async def test_empty_stream_stops_pages(self, mocked, stream_client):
+        mocked.get(
+            stream_client.stream().path,
+            body="[]",
+            status=200,
+            content_type="application/json",
+            headers={"X-Next": "http://api.example.org/next_batch"},
+        )
+        response = await stream_client.stream().get()
+        assert [item async for item in response().pages()] == []
+
+    async def test_error_responses_are_not_streamed(self, mocked, stream_client):
+        mocked.get(
+            stream_client.stream().path,
+            body='{"error": "bad request"}',
+            status=400,
+            content_type="application/json",
+        )
+        with pytest.raises(ClientError) as exc_info:
+            await stream_client.stream().get()
+        assert exc_info.value.data == {"error": "bad request"}
+
+
+class TestTapiocaClientExecutorStream:
+    async def test_stream_chunks(self, mocked, client):
+        body = bytes(range(256)) * 1024
+        mocked.get(client.test().path, body=body, status=200)
+
+        response = await client.test().get(stream=True)
+        stream = response.data()
+        assert isinstance(stream, ResponseStream)
+        assert not stream.closed
+
+        chunks = [chunk async for chunk in stream.iter_chunked(1024)]
+        assert len(chunks) == 256
+        assert b"".join(chunks) == body
+        assert stream.closed
+
+    async def test_stream_save_to(self, mocked, client, tmp_path):
+        body = b"binary artifact" * 10000
+        mocked.get(client.test().path, body=body, status=200)
+
+        response = await client.test().get(stream=True)
+        size = await response.data().save_to(tmp_path / "artifact.bin")
+
+        assert size == len(body)
+        assert (tmp_path / "artifact.bin").read_bytes() == body
+        assert response.data().closed
+
+    async def test_stream_closed_by_context_manager(self, mocked, client):
+        mocked.get(client.test().path, body=b"x" * 100000, status=200)
+
+        response = await client.test().get(stream=True)
+        async with response.data() as stream:
+            async for chunk in stream.iter_chunked(10):
+                break
+        assert stream.closed
+
+    async def test_stream_error_response(self, mocked, client):
+        mocked.get(client.test().path, body='{"error": "not found"}', status=404)
+
+        with pytest.raises(ClientError) as exc_info:
+            await client.test().get(stream=True)
+        assert exc_info.value.data == {"error": "not found"}
+
+
 class TestTapiocaClientResponse:
     async def test_available_attributes(self, mocked, client):
         next_url = "http://api.example.org/next_batch"
@@ -879,6 +1917,7 @@ class TestTapiocaClientResponse:
                 "status",
                 "url",
                 "request_kwargs",
+                "attempts",
                 "data",
             ]
         )
@@ -1107,6 +2146,28 @@ class TestProcessData:
         assert "other" in response.data
         assert "wat" not in response.data
 
+    async def test_response_body_is_read_as_bytes(self, mocked, client):
+        mocked.get(
+            client.test().path,
+            body='{"data": "é"}'.encode(),
+            status=200,
+            content_type="application/json",
+        )
+        mocked.get(
+            client.test().path,
+            body="not JSON: é".encode("latin-1"),
+            status=200,
+            headers={"Content-Type": "text/plain; charset=latin-1"},
+        )
+
+        response = await client.test().get()
+        assert response.data() == {"data": "é"}
+        data = await client._api.get_response_data(response.response)
+        assert data == '{"data": "é"}'.encode()
+
+        response = await client.test().get()
+        assert response.data() == "not JSON: é"
+
     async def test_transform_came_case_in_snake_case(self, mocked, client):
         next_url = "http://api.example.org/next_batch"
 
@@ -1134,6 +2195,45 @@ class TestProcessData:
         assert response.data.data.camel_case() == "data in camel case"
         assert response.data.data.normal_camel_case() == "data in camel case"
 
+    async def test_normalize_response_keys(self, mocked):
+        async with NormalizedKeysClient() as client:
+            response_data = {
+                "userList": [
+                    {"userName": "first", "HTTPStatus": 200},
+                    {"userName": "second", "HTTPStatus": 404, "tags": [{"tagId": 1}]},
+                ],
+            }
+            mocked.get(
+                client.test().path,
+                body=json.dumps(response_data),
+                status=200,
+                content_type="application/json",
+            )
+
+            response = await client.test().get()
+
+        assert response.data() == {
+            "user_list": [
+                {"user_name": "first", "http_status": 200},
+                {"user_name": "second", "http_status": 404, "tags": [{"tag_id": 1}]},
+            ],
+        }
+        first, second = response.data.user_list()
+        assert next(iter(first)) is next(iter(second))
+        assert response.data.user_list[1].tags[0].tag_id() == 1
+
+    def test_key_name_translation_is_cached(self):
+        from aiotapioca.client.process_data import _get_fallback_names
+
+        _get_fallback_names.cache_clear()
+        data = ProcessData(None, {"userName": "value", 1: "one"}, {})
+
+        assert data.user_name() == "value"
+        assert data.user_name() == "value"
+        assert data[1]() == "one"
+        assert _get_fallback_names("user_name") == ("user_name", "userName", "UserName")
+        assert _get_fallback_names.cache_info().hits == 2
+
     async def test_should_be_able_to_access_by_index(self, mocked, client):
         response_data = ["a", "b", "c"]
         mocked.get(
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+from aiotapioca import (
+    BaseRetryPolicy,
+    DecorrelatedJitterRetryPolicy,
+    ExponentialRetryPolicy,
+    FixedRetryPolicy,
+    RetryAfterRetryPolicy,
+)
+
+
+def make_response(headers=None):
+    return SimpleNamespace(headers=headers or {})
+
+
+def test_base_policy_has_no_delay():
+    policy = BaseRetryPolicy()
+    assert [policy.get_delay(number) for number in range(1, 4)] == [0.0, 0.0, 0.0]
+
+
+def test_fixed_policy():
+    policy = FixedRetryPolicy(0.5)
+    assert [policy.get_delay(number) for number in range(1, 4)] == [0.5, 0.5, 0.5]
+
+
+def test_exponential_policy():
+    policy = ExponentialRetryPolicy(base=0.5, factor=2, max_delay=3)
+    delays = [policy.get_delay(number) for number in range(1, 6)]
+    assert delays == [0.5, 1.0, 2.0, 3, 3]
+
+
+def test_exponential_policy_with_many_retries():
+    for factor in (2, 2.0, 10.0):
+        policy = ExponentialRetryPolicy(base=0.5, factor=factor, max_delay=3)
+        for number in (1025, 1500, 100000):
+            assert policy.get_delay(number) == 3
+
+
+def test_exponential_policy_with_jitter():
+    policy = ExponentialRetryPolicy(base=1, factor=2, max_delay=10, jitter=True)
+    for number in range(1, 10):
+        assert 0 <= policy.get_delay(number) <= min(10, 2 ** (number - 1))
+
+
+def test_decorrelated_jitter_policy():
+    policy = DecorrelatedJitterRetryPolicy(base=0.1, max_delay=2)
+    delay = 0.0
+    for number in range(1, 20):
+        upper = max(0.1, delay * 3)
+        delay = policy.get_delay(number, delay)
+        assert 0.1 <= delay <= min(2, upper)
+
+
+def test_retry_after_policy_seconds():
+    policy = RetryAfterRetryPolicy(max_delay=10)
+    assert policy.get_delay(1, response=make_response({"Retry-After": "3"})) == 3
+    assert policy.get_delay(1, response=make_response({"Retry-After": "60"})) == 10
+
+
+def test_retry_after_policy_http_date():
+    policy = RetryAfterRetryPolicy()
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    response = make_response({"Retry-After": format_datetime(retry_at, usegmt=True)})
+    assert 25 <= policy.get_delay(1, response=response) <= 30
+
+
+def test_retry_after_policy_fallback():
+    policy = RetryAfterRetryPolicy(fallback=FixedRetryPolicy(2))
+    assert policy.get_delay(1, response=make_response()) == 2
+    assert policy.get_delay(1, response=make_response({"Retry-After": "soon"})) == 2
+    assert policy.get_delay(1, response=None) == 2
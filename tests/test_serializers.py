@@ -1,11 +1,14 @@
+import sys
+from collections import OrderedDict
 from decimal import Decimal
 
 import pytest
 import pytest_asyncio
+from aioresponses import CallbackResult
 
 from aiotapioca import BaseSerializer, SimpleSerializer
 
-from .clients import SerializerClient, SimpleClient
+from .clients import EncoderSerializerClient, SerializerClient, SimpleClient
 
 
 @pytest.fixture
@@ -171,3 +174,67 @@ class TestSerialization:
         data = {"key": [Decimal("1.0"), Decimal("1.1"), Decimal("1.2")]}
         serialized = serializer.serialize(data)
         assert serialized == {"key": ["1.0", "1.1", "1.2"]}
+
+    def test_serialization_follows_the_mro(self, serializer):
+        class Price(Decimal):
+            pass
+
+        data = OrderedDict(key=[Price("1.0")], other=(Decimal("1.1"),))
+        serialized = serializer.serialize(data)
+        assert serialized == {"key": ["1.0"], "other": (Decimal("1.1"),)}
+
+    def test_serialization_of_deeply_nested_data(self, serializer):
+        data = [Decimal("1.0")]
+        for _ in range(sys.getrecursionlimit() * 2):
+            data = {"key": [data]}
+        serialized = serializer.serialize(data)
+        for _ in range(sys.getrecursionlimit() * 2):
+            serialized = serialized["key"][0]
+        assert serialized == ["1.0"]
+
+    def test_serialization_of_shared_containers(self, serializer):
+        shared = [Decimal("1.0")]
+        data = {"key1": shared, "key2": [shared, {"key3": shared}]}
+        serialized = serializer.serialize(data)
+        assert serialized == {"key1": ["1.0"], "key2": [["1.0"], {"key3": ["1.0"]}]}
+
+    def test_serialization_of_circular_references(self, serializer):
+        data = {"key": [Decimal("1.0")]}
+        data["key"].append({"parent": data})
+        with pytest.raises(ValueError, match="Circular reference detected"):
+            serializer.serialize(data)
+
+        data = [1]
+        data.append(data)
+        with pytest.raises(ValueError, match="Circular reference detected"):
+            serializer.serialize(data)
+
+    def test_overridden_container_method_is_used(self):
+        class UpperKeysSerializer(SimpleSerializer):
+            def serialize_dict(self, data):
+                serialized = super().serialize_dict(data)
+                return {key.upper(): value for key, value in serialized.items()}
+
+        data = {"key": [{"nested": Decimal("1.0")}]}
+        serialized = UpperKeysSerializer().serialize(data)
+        assert serialized == {"KEY": [{"NESTED": "1.0"}]}
+        assert SimpleSerializer().serialize(data) == {"key": [{"nested": "1.0"}]}
+
+    def test_json_default(self, serializer):
+        assert serializer.json_default(Decimal("1.0")) == "1.0"
+        with pytest.raises(TypeError, match="object is not JSON serializable"):
+            serializer.json_default(object())
+
+    async def test_serialize_in_json_encoder(self, mocked):
+        def callback(url, **kwargs):
+            return CallbackResult(status=201, body=kwargs["data"])
+
+        async with EncoderSerializerClient() as client:
+            adapter = client._api
+            data = {"key": [Decimal("1.0"), {"nested": Decimal("1.1")}]}
+            assert adapter.serialize_data(data) is data
+
+            mocked.post(client.test().path, callback=callback)
+            response = await client.test().post(data=data)
+
+        assert response.data() == {"key": ["1.0", {"nested": "1.1"}]}
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from aiotapioca.streams import JSONArrayParser, NDJSONParser
+
+
+def feed_in_chunks(data, chunk_size, parser_class=JSONArrayParser):
+    parser = parser_class()
+    items = []
+    for index in range(0, len(data), chunk_size):
+        items.extend(parser.feed(data[index : index + chunk_size]))
+    items.extend(parser.feed(b"", final=True))
+    return items
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1024])
+def test_json_array_parser(chunk_size):
+    data = [
+        {"key": 'value with "quotes", brackets ] and é', "list": [1.5e3, None]},
+        12345678901234567890,
+        -0.5,
+        "string",
+        [],
+        {},
+        True,
+    ]
+    body = json.dumps(data, ensure_ascii=False, indent=2).encode()
+    assert feed_in_chunks(body, chunk_size) == data
+
+
+def test_json_array_parser_item_spanning_many_chunks():
+    item = {
+        "rows": [
+            {"id": i, "name": 'a "quoted" ] }' + "\\" * (i % 3)} for i in range(2000)
+        ]
+    }
+    body = json.dumps([item, "after"]).encode()
+    parser = JSONArrayParser()
+    decoded = []
+    original_raw_decode = parser._decoder.raw_decode
+
+    def raw_decode(*args):
+        decoded.append(args)
+        return original_raw_decode(*args)
+
+    parser._decoder.raw_decode = raw_decode
+    items = []
+    for index in range(0, len(body), 64):
+        items.extend(parser.feed(body[index : index + 64]))
+    items.extend(parser.feed(b"", final=True))
+
+    assert items == [item, "after"]
+    assert len(body) // 64 > 1000
+    # the item is decoded once it may be complete, not on every chunk
+    assert len(decoded) < 10
+
+
+def test_json_array_parser_empty_array():
+    assert feed_in_chunks(b" [ ] ", 1) == []
+
+
+@pytest.mark.parametrize(
+    "body", [b'{"key": 1}', b"[1, 2", b"[1 2]", b"[1x]", b"[1]2", b"[1,]"]
+)
+def test_json_array_parser_invalid_data(body):
+    with pytest.raises(ValueError):
+        feed_in_chunks(body, 1)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1024])
+def test_ndjson_parser(chunk_size):
+    data = [{"key": "value\nwith newline"}, [1, 2], "string", 1.5]
+    body = "\n".join(json.dumps(item) for item in data).encode() + b"\n\n"
+    assert feed_in_chunks(body, chunk_size, NDJSONParser) == data
+
+
+def test_ndjson_parser_line_spanning_many_chunks():
+    line = {"rows": [{"id": i} for i in range(2000)]}
+    body = json.dumps(line).encode() + b"\n" + json.dumps(line).encode()
+    parser = NDJSONParser()
+    assert parser.feed(body[:-10]) == [line]
+    assert feed_in_chunks(body, 64, NDJSONParser) == [line, line]
+
+
+def test_ndjson_parser_without_final_newline():
+    body = b'{"key": 1}\r\n{"key": 2}'
+    assert feed_in_chunks(body, 3, NDJSONParser) == [{"key": 1}, {"key": 2}]